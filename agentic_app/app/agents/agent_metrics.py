@@ -0,0 +1,74 @@
+from typing import Any, Dict, Iterable, List
+
+from utils.metrics import Metrics, Family
+from agents.usage_tracker import UsageTracker
+from agents.response_cache import AgentResponseCache
+from agents.llm_factory import LLMFactory
+from agents.builder.greeting_classifier import GreetingClassifier
+from agents.builder.rule_decomposer import RuleDecomposer
+from agents.rag_builder.rag_retriver import RagRetriever, RETRIEVAL_DURATION
+
+NODE_DURATION = "agent_node_duration_seconds"
+REQUEST_DURATION = "agent_request_duration_seconds"
+CONTEXT_TOKENS = "agent_context_tokens"
+
+# Tokens per MainAgent call; the compact context is usually a few hundred
+TOKEN_BUCKETS = (64, 128, 256, 512, 1024, 2048, 4096, 8192, 16384)
+
+Metrics.describe(NODE_DURATION, "histogram", "Wall time of each AgentExecutor graph node")
+Metrics.describe(REQUEST_DURATION, "histogram", "Wall time of AgentExecutor.invoke/ainvoke by response cache result")
+Metrics.describe(CONTEXT_TOKENS, "histogram", "Context plus query tokens sent to each MainAgent call")
+Metrics.describe(RETRIEVAL_DURATION, "histogram", "Wall time of RagRetriever calls")
+
+
+def _cache_samples(cache: str, stats: Dict[str, Any]) -> List:
+    return [
+        ({"cache": cache, "result": "hit"}, stats.get("hits", 0)),
+        ({"cache": cache, "result": "miss"}, stats.get("misses", 0)),
+    ]
+
+
+def collect_agent_metrics() -> Iterable[Family]:
+    """Expose the existing per-component stats() counters as Prometheus families"""
+    usage = UsageTracker.stats()
+    for name, key in (("prompt", "prompt_tokens"), ("cached", "cached_tokens"), ("completion", "completion_tokens")):
+        yield (
+            f"llm_{name}_tokens_total", "counter", f"LLM {name} tokens per agent stage",
+            [({"stage": stage}, totals[key]) for stage, totals in sorted(usage.items())],
+        )
+    yield (
+        "llm_calls_total", "counter", "LLM calls per agent stage",
+        [({"stage": stage}, totals["calls"]) for stage, totals in sorted(usage.items())],
+    )
+
+    cache_samples = _cache_samples("agent_response", AgentResponseCache.stats())
+    embedding_stats = LLMFactory.embedding_cache_stats()
+    if embedding_stats:
+        cache_samples += [
+            ({"cache": "embedding", "result": "memory_hit"}, embedding_stats.get("memory_hits", 0)),
+            ({"cache": "embedding", "result": "disk_hit"}, embedding_stats.get("disk_hits", 0)),
+            ({"cache": "embedding", "result": "miss"}, embedding_stats.get("misses", 0)),
+        ]
+    yield ("agent_cache_lookups_total", "counter", "Cache lookups by cache and result", cache_samples)
+
+    greeting = GreetingClassifier.stats()
+    yield (
+        "greeting_classifier_decisions_total", "counter", "Greeting classifier decisions by path",
+        [({"path": path}, value) for path, value in sorted(greeting.items()) if path not in ("llm_calls_avoided", "local_ratio")],
+    )
+
+    decomposer = RuleDecomposer.stats()
+    yield (
+        "rule_decomposer_decisions_total", "counter", "Query decompositions by path",
+        [({"path": path}, value) for path, value in sorted(decomposer.items()) if path not in ("llm_calls_avoided", "local_ratio")],
+    )
+
+    retriever = RagRetriever.stats()
+    yield (
+        "rag_retrieval_paths_total", "counter", "RAG subqueries served per retrieval path",
+        [({"path": path}, value) for path, value in sorted(retriever.items()) if path != "embedding_batches"],
+    )
+    yield ("rag_embedding_batches_total", "counter", "Batched query embedding calls", [({}, retriever.get("embedding_batches", 0))])
+
+
+Metrics.register_collector(collect_agent_metrics)
@@ -0,0 +1,123 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+
+from agents.llm_factory import LLMFactory
+from agents.builder.agent_graph import AgentExecutor
+from agents.builder.context_serializer import ContextSerializer
+from agents.rag_builder.rag_retriver import RagRetriever
+
+
+class AgentRegistry:
+    """
+    Process-wide holder for the agent objects that are expensive to build.
+
+    The compiled LangGraph workflow, the chat model and the opened Chroma
+    collection are created once per worker (from the FastAPI lifespan) and
+    shared by every request. The compiled graph keeps no per-request state,
+    so a single executor can safely serve concurrent requests.
+    """
+
+    _lock = threading.RLock()
+    _executor: Optional[AgentExecutor] = None
+    _timings: Dict[str, float] = {}
+    _started_at: Optional[float] = None
+    _last_error: Optional[str] = None
+
+    @staticmethod
+    def _elapsed_ms(start: float) -> float:
+        return round((time.perf_counter() - start) * 1000, 2)
+
+    @classmethod
+    def startup(cls) -> Dict[str, float]:
+        """
+        Build the shared LLM client, retriever and compiled graph and warm up the vector store
+
+        Returns:
+            Dict[str, float]: Startup timings in milliseconds per stage
+        """
+        with cls._lock:
+            timings = {}
+            total_start = time.perf_counter()
+            try:
+                start = time.perf_counter()
+                llm = LLMFactory.open_ai()
+                timings["llm_client_ms"] = cls._elapsed_ms(start)
+
+                start = time.perf_counter()
+                rag_retriever = RagRetriever()
+                timings["retriever_ms"] = cls._elapsed_ms(start)
+
+                start = time.perf_counter()
+                executor = AgentExecutor(llm=llm, rag_retriever=rag_retriever)
+                timings["graph_compile_ms"] = cls._elapsed_ms(start)
+
+                start = time.perf_counter()
+                ContextSerializer.load_encoder()
+                timings["tokenizer_ms"] = cls._elapsed_ms(start)
+
+                start = time.perf_counter()
+                cls._warm_up(rag_retriever)
+                timings["warm_up_ms"] = cls._elapsed_ms(start)
+
+                cls._executor = executor
+                cls._last_error = None
+            except Exception as e:
+                # Keep the app serving; get_executor() retries the build lazily
+                cls._last_error = str(e)
+                print(f"Error initializing agent registry: {e}")
+
+            timings["total_ms"] = cls._elapsed_ms(total_start)
+            cls._timings = timings
+            cls._started_at = time.time()
+
+        print(f"Agent registry startup timings: {timings}")
+        return timings
+
+    @classmethod
+    def _warm_up(cls, rag_retriever: RagRetriever) -> None:
+        """Touch the Chroma collection so the first request does not pay for opening it"""
+        vector_store = rag_retriever.vector_store
+        if vector_store is None:
+            return
+        collection = getattr(vector_store, "_collection", None)
+        if collection is not None:
+            print(f"Vector store warmed up with {collection.count()} documents")
+
+    @classmethod
+    def get_executor(cls) -> AgentExecutor:
+        """Return the shared executor, building it on first use if startup did not run or failed"""
+        if cls._executor is None:
+            with cls._lock:
+                if cls._executor is None:
+                    cls.startup()
+        if cls._executor is None:
+            raise RuntimeError(f"Agent registry is not available: {cls._last_error}")
+        return cls._executor
+
+    @classmethod
+    def reload_retriever(cls) -> None:
+        """Reopen the Chroma collection after the vector store has been rebuilt or deleted"""
+        with cls._lock:
+            if cls._executor is None:
+                return
+            start = time.perf_counter()
+            rag_retriever = RagRetriever()
+            cls._warm_up(rag_retriever)
+            cls._executor.rag_retriever = rag_retriever
+            cls._timings["retriever_reload_ms"] = cls._elapsed_ms(start)
+
+    @classmethod
+    def shutdown(cls) -> None:
+        """Drop the shared objects when the worker stops"""
+        with cls._lock:
+            cls._executor = None
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        return {
+            "ready": cls._executor is not None,
+            "started_at": cls._started_at,
+            "timings": dict(cls._timings),
+            "last_error": cls._last_error,
+        }
@@ -1,18 +1,29 @@
 
-from typing import Dict, Any, List, TypedDict
+import asyncio
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Dict, Any, AsyncIterator, Callable, List, TypedDict
+from config import AGENT_SUBQUERY_CONCURRENCY, AGENT_GRAPH_MODE, RAG_FILTER_BY_ROLE
 from agents.llm_factory import LLMFactory
 from agents.builder.query_translator import QueryTranslator
 from agents.builder.query_decompositaion import QueryDecomposition
 from langgraph.graph import StateGraph, START, END
+from langgraph.config import get_stream_writer
+from langchain_core.runnables import RunnableLambda
 from agents.rag_builder.rag_retriver import RagRetriever
 from agents.builder.gretting_agent import GrettingAgent
 from agents.controllers.structured_output import OutputSchema
 from agents.builder.main_agent import MainAgent
 from agents.builder.query_ambugity_checker import QueryAmbiguityChecker
+from agents.response_cache import AgentResponseCache
+from agents.builder.context_serializer import ContextSerializer
+from agents.agent_metrics import NODE_DURATION, REQUEST_DURATION, CONTEXT_TOKENS, TOKEN_BUCKETS
+from utils.metrics import Metrics
 
 class AgentState(TypedDict):
     """State schema for the agent workflow"""
     query: str
+    role_id: int
     normalized_query: str
     decomposed_queries: List[str]
     rag_contexts: List[Dict[str, Any]]
@@ -24,35 +35,119 @@ class AgentState(TypedDict):
     ai_question: str
     clarification_needed: bool
     active_query: int
+    subquery_errors: List[Dict[str, str]]
+    context_tokens: List[Dict[str, Any]]
+    node_errors: List[Dict[str, str]]
+
+# Keys each intake branch is allowed to write when the branches run in parallel
+NORMALIZE_BRANCH_KEYS = ("normalized_query", "node_errors")
+GREETING_BRANCH_KEYS = ("isQueryGreeting", "welcomeMessage", "agent_output")
 
 class AgentExecutor:
-    def __init__(self):
-        self.llm = LLMFactory().open_ai()
+    def __init__(self, llm=None, rag_retriever: RagRetriever = None, graph_mode: str = None):
+        """
+        Args:
+            llm: Optional shared chat model. Built from LLMFactory when omitted
+            rag_retriever: Optional shared retriever holding an opened Chroma collection
+            graph_mode: "parallel" runs translation and greeting detection as parallel
+                branches, "sequential" chains them. Defaults to AGENT_GRAPH_MODE
+        """
+        self.llm = llm if llm is not None else LLMFactory().open_ai()
+        self.main_agent = MainAgent(llm=self.llm)
+        self.subquery_concurrency = max(1, AGENT_SUBQUERY_CONCURRENCY)
+        self.graph_mode = (graph_mode or AGENT_GRAPH_MODE).lower()
         self.workflow = self._build_workflow()
-        self.rag_retriever = RagRetriever()
+        self.rag_retriever = rag_retriever if rag_retriever is not None else RagRetriever()
     
     def _build_workflow(self) -> StateGraph:
-        """Build the LangGraph workflow"""
+        """Build the LangGraph workflow
+        
+        Every LLM-bound node is registered with both a sync and an async
+        implementation, so the same compiled graph serves invoke() and ainvoke().
+        """
         workflow = StateGraph(AgentState)
         # Add nodes
-        workflow.add_node("normalize_query", self.normalize_query)
-        workflow.add_node("greeting_query_checker", self.greeting_query_checker)
-        workflow.add_node("response_with_ai_message", self.response_with_ai_message)
-        workflow.add_node("decompose_query", self.decompose_query)
-        workflow.add_node("get_rag_contexts", self.get_rag_contexts)
-        workflow.add_node("finalize_output", self.finalize_output)
-        workflow.add_node("get_output", self.get_output)
+        if self.graph_mode == "parallel":
+            self._add_parallel_intake(workflow)
+        else:
+            workflow.add_node("normalize_query", self._node("normalize_query", self.normalize_query, self.anormalize_query))
+            workflow.add_node("greeting_query_checker", self._node("greeting_query_checker", self.greeting_query_checker, self.agreeting_query_checker))
+            workflow.add_edge(START, "normalize_query")
+            workflow.add_edge("normalize_query", "greeting_query_checker")
+            workflow.add_conditional_edges("greeting_query_checker", self.greeting_conditional)
+        workflow.add_node("response_with_ai_message", self._node("response_with_ai_message", self.response_with_ai_message, self.aresponse_with_ai_message))
+        workflow.add_node("decompose_query", self._node("decompose_query", self.decompose_query, self.adecompose_query))
+        workflow.add_node("get_rag_contexts", self._node("get_rag_contexts", self.get_rag_contexts, self.aget_rag_contexts))
+        workflow.add_node("finalize_output", self._node("finalize_output", self.finalize_output))
+        workflow.add_node("get_output", self._node("get_output", self.get_output, self.aget_output))
         # Add edges
-        workflow.add_edge(START, "normalize_query")
-        workflow.add_edge("normalize_query", "greeting_query_checker")
-        workflow.add_conditional_edges("greeting_query_checker", self.greeting_conditional)
         workflow.add_conditional_edges("response_with_ai_message", self.query_ambiguity_checker)
         workflow.add_edge("decompose_query", "get_rag_contexts")
         workflow.add_edge("get_rag_contexts", "get_output")
         workflow.add_edge("get_output", "finalize_output")
         workflow.add_edge("finalize_output", END)
         return workflow.compile()
+
+    @staticmethod
+    def _node(name: str, func, afunc=None) -> RunnableLambda:
+        """Register a node with its sync/async implementations timed under agent_node_duration_seconds"""
+        timed = Metrics.timed(NODE_DURATION, node=name)
+        return RunnableLambda(timed(func), afunc=timed(afunc) if afunc is not None else None)
     
+    def _add_parallel_intake(self, workflow: StateGraph) -> None:
+        """
+        Translation and greeting detection both only need the raw query, so they
+        run as parallel branches and join before the ambiguity check. Each branch
+        returns only the keys it owns so LangGraph can merge the two updates.
+        """
+        workflow.add_node("normalize_query", self._node("normalize_query", self.normalize_query_branch, self.anormalize_query_branch))
+        workflow.add_node("greeting_query_checker", self._node("greeting_query_checker", self.greeting_query_branch, self.agreeting_query_branch))
+        workflow.add_node("join_intake", self._node("join_intake", self.join_intake))
+        workflow.add_edge(START, "normalize_query")
+        workflow.add_edge(START, "greeting_query_checker")
+        workflow.add_edge(["normalize_query", "greeting_query_checker"], "join_intake")
+        workflow.add_conditional_edges("join_intake", self.greeting_conditional)
+
+    def normalize_query_branch(self, state: AgentState) -> Dict[str, Any]:
+        return self._select_keys(self.normalize_query(dict(state)), NORMALIZE_BRANCH_KEYS)
+
+    async def anormalize_query_branch(self, state: AgentState, config: Dict[str, Any] = None) -> Dict[str, Any]:
+        """Translate the query, but give up as soon as the greeting branch reports a greeting"""
+        greeting_signal = self._greeting_signal(config)
+        translation = asyncio.ensure_future(self.anormalize_query(dict(state)))
+        if greeting_signal is None:
+            return self._select_keys(await translation, NORMALIZE_BRANCH_KEYS)
+
+        greeting_wait = asyncio.ensure_future(greeting_signal.wait())
+        await asyncio.wait({translation, greeting_wait}, return_when=asyncio.FIRST_COMPLETED)
+        if translation.done():
+            greeting_wait.cancel()
+            return self._select_keys(translation.result(), NORMALIZE_BRANCH_KEYS)
+
+        # Greeting detected: the CRM path will not run, so stop paying for the translation
+        translation.cancel()
+        return {"normalized_query": state["query"]}
+
+    def greeting_query_branch(self, state: AgentState) -> Dict[str, Any]:
+        return self._select_keys(self.greeting_query_checker(dict(state)), GREETING_BRANCH_KEYS)
+
+    async def agreeting_query_branch(self, state: AgentState, config: Dict[str, Any] = None) -> Dict[str, Any]:
+        result = await self.agreeting_query_checker(dict(state))
+        greeting_signal = self._greeting_signal(config)
+        if result.get("isQueryGreeting") is True and greeting_signal is not None:
+            greeting_signal.set()
+        return self._select_keys(result, GREETING_BRANCH_KEYS)
+
+    def join_intake(self, state: AgentState) -> Dict[str, Any]:
+        """Join point of the parallel intake branches"""
+        return {}
+
+    def _greeting_signal(self, config: Dict[str, Any] = None):
+        return ((config or {}).get("configurable") or {}).get("greeting_signal")
+
+    def _select_keys(self, state: Dict[str, Any], keys) -> Dict[str, Any]:
+        return {key: state[key] for key in keys if key in state}
+
     # Conditional edge: if greeting, go to END; else, go to decompose_query
     def greeting_conditional(self, state: AgentState):
         # Only end if greeting is explicitly YES, otherwise continue to decompose_query
@@ -82,11 +177,35 @@ class AgentExecutor:
         except Exception as e:
             # Fallback to original query if normalization fails
             state["normalized_query"] = state["query"]
+            self._record_error(state, "normalize_query", e)
+        return state
+
+    async def anormalize_query(self, state: AgentState) -> AgentState:
+        """Async version of normalize_query"""
+        try:
+            query = state["query"]
+            if not query or not query.strip():
+                state["normalized_query"] = ""
+                return state
+
+            normalized_query = await QueryTranslator.ainvoke(query.strip())
+            state["normalized_query"] = normalized_query or query.strip()
+        except Exception as e:
+            state["normalized_query"] = state["query"]
+            self._record_error(state, "normalize_query", e)
         return state
 
     def response_with_ai_message(self, state: AgentState) -> Any:
         """Check the greeting Message"""
         response = QueryAmbiguityChecker().invoke(state["normalized_query"])
+        return self._apply_ambiguity_result(state, response)
+
+    async def aresponse_with_ai_message(self, state: AgentState) -> Any:
+        """Async version of response_with_ai_message"""
+        response = await QueryAmbiguityChecker.ainvoke(state["normalized_query"])
+        return self._apply_ambiguity_result(state, response)
+
+    def _apply_ambiguity_result(self, state: AgentState, response: Dict[str, Any]) -> AgentState:
         if response.get("is_ambiguous") == "YES":
             state["is_ambiguous"] = True
             state["agent_output"] = {
@@ -101,6 +220,14 @@ class AgentExecutor:
     def greeting_query_checker(self, state: AgentState) -> Any:
         """Check the greeting Message"""
         is_greeting = GrettingAgent().invoke(state["query"])
+        return self._apply_greeting_result(state, is_greeting)
+
+    async def agreeting_query_checker(self, state: AgentState) -> Any:
+        """Async version of greeting_query_checker"""
+        is_greeting = await GrettingAgent.ainvoke(state["query"])
+        return self._apply_greeting_result(state, is_greeting)
+
+    def _apply_greeting_result(self, state: AgentState, is_greeting: Dict[str, Any]) -> AgentState:
         if is_greeting.get("greeting") == "YES":
             state["isQueryGreeting"] = True
             state["welcomeMessage"] = is_greeting.get("greetingReply")
@@ -123,16 +250,34 @@ class AgentExecutor:
                 return state
                 
             decomposed_queries = QueryDecomposition.invoke(normalized_query)
-            # Ensure we always have a list
-            if isinstance(decomposed_queries, list):
-                state["decomposed_queries"] = decomposed_queries
-                
-                
-            else:
-                state["decomposed_queries"] = [str(decomposed_queries)]
+            self._apply_decomposition(state, decomposed_queries)
         except Exception as e:
             # Fallback to single query if decomposition fails
             state["decomposed_queries"] = [state["normalized_query"]]
+            self._record_error(state, "decompose_query", e)
+        return state
+
+    async def adecompose_query(self, state: AgentState) -> AgentState:
+        """Async version of decompose_query"""
+        try:
+            normalized_query = state["normalized_query"]
+            if not normalized_query:
+                state["decomposed_queries"] = []
+                return state
+
+            decomposed_queries = await QueryDecomposition.ainvoke(normalized_query)
+            self._apply_decomposition(state, decomposed_queries)
+        except Exception as e:
+            state["decomposed_queries"] = [state["normalized_query"]]
+            self._record_error(state, "decompose_query", e)
+        return state
+
+    def _apply_decomposition(self, state: AgentState, decomposed_queries: Any) -> AgentState:
+        # Ensure we always have a list
+        if isinstance(decomposed_queries, list):
+            state["decomposed_queries"] = decomposed_queries
+        else:
+            state["decomposed_queries"] = [str(decomposed_queries)]
         return state
     
     def get_rag_contexts(self, state: AgentState) -> AgentState:
@@ -143,39 +288,129 @@ class AgentExecutor:
                 state["rag_contexts"] = []
                 return state
             
-            rag_contexts = self.rag_retriever.invoke_list(decomposed_queries)
+            rag_contexts = self.rag_retriever.invoke_list(decomposed_queries, filters=self._rag_filters(state))
             state["rag_contexts"] = rag_contexts
         except Exception as e:
             state["rag_contexts"] = []  # Fallback to empty list on error
+            self._record_error(state, "get_rag_contexts", e)
         return state
-    
-    def get_output(self, state: AgentState) -> AgentState:
-        """Fetch RAG contexts for the decomposed queries"""
-        
-        agent_output_list = []
-        
+
+    async def aget_rag_contexts(self, state: AgentState) -> AgentState:
+        """Async version of get_rag_contexts"""
         try:
-            agent_output = state["agent_output"]
             decomposed_queries = state["decomposed_queries"]
+            if not decomposed_queries:
+                state["rag_contexts"] = []
+                return state
 
-            if not agent_output or decomposed_queries.count == 0:
-                state["agent_output"] = []
+            state["rag_contexts"] = await self.rag_retriever.ainvoke_list(decomposed_queries, filters=self._rag_filters(state))
+        except Exception as e:
+            state["rag_contexts"] = []
+            self._record_error(state, "get_rag_contexts", e)
+        return state
 
-            for decomposed_query in decomposed_queries:
-                state["active_query"] = decomposed_query
+    @staticmethod
+    def _record_error(state: AgentState, node: str, error: Exception) -> None:
+        """Note a node that fell back after a failure, so the degraded response is not cached"""
+        state["node_errors"] = list(state.get("node_errors") or []) + [{"node": node, "error": str(error)}]
+
+    def _rag_filters(self, state: AgentState) -> Dict[str, Any]:
+        if RAG_FILTER_BY_ROLE and state.get("role_id") is not None:
+            return {"role_id": state["role_id"]}
+        return {}
+    
+    def _subquery_contexts(self, state: AgentState, decomposed_queries: List[str]) -> List[str]:
+        """Serialize each subquery's own RAG documents and record the context size per call"""
+        contexts = []
+        context_tokens = []
+        for decomposed_query in decomposed_queries:
+            context = ContextSerializer.serialize(
+                ContextSerializer.contexts_for(state.get("rag_contexts"), decomposed_query)
+            )
+            tokens = ContextSerializer.count_tokens(context) + ContextSerializer.count_tokens(decomposed_query)
+            Metrics.observe(CONTEXT_TOKENS, tokens, buckets=TOKEN_BUCKETS)
+            contexts.append(context)
+            context_tokens.append({"query": decomposed_query, "tokens": tokens})
+        state["context_tokens"] = context_tokens
+        return contexts
+
+    def get_output(self, state: AgentState) -> AgentState:
+        """Run MainAgent for every decomposed query, at most subquery_concurrency at a time"""
+        decomposed_queries = state.get("decomposed_queries") or []
+        contexts = self._subquery_contexts(state, decomposed_queries)
+
+        write = self._stream_writer()
+
+        def run(index: int, decomposed_query: str, context: str) -> Any:
+            try:
                 print("The active query is:", decomposed_query)
-                # Create a new MainAgent instance and invoke with proper state
-                main_agent = MainAgent()
-                query_result = main_agent.invoke(
-                    query=decomposed_query,
-                    context=state["rag_contexts"]
-                )
-                print("Query result:", query_result)
+                result = self.main_agent.invoke(query=decomposed_query, context=context)
+            except Exception as e:
+                result = e
+            self._emit_result(write, index, decomposed_query, result)
+            return result
+
+        if len(decomposed_queries) <= 1:
+            results = [run(index, query, context) for index, (query, context) in enumerate(zip(decomposed_queries, contexts))]
+        else:
+            max_workers = min(self.subquery_concurrency, len(decomposed_queries))
+            with ThreadPoolExecutor(max_workers=max_workers) as pool:
+                # map() yields results in input order
+                results = list(pool.map(run, range(len(decomposed_queries)), decomposed_queries, contexts))
+
+        return self._merge_outputs(state, decomposed_queries, results)
+
+    async def aget_output(self, state: AgentState) -> AgentState:
+        """Async version of get_output"""
+        decomposed_queries = state.get("decomposed_queries") or []
+        contexts = self._subquery_contexts(state, decomposed_queries)
+        semaphore = asyncio.Semaphore(self.subquery_concurrency)
+        write = self._stream_writer()
+
+        async def run(index: int, decomposed_query: str, context: str) -> Any:
+            async with semaphore:
+                try:
+                    result = await self.main_agent.ainvoke(query=decomposed_query, context=context)
+                except Exception as e:
+                    result = e
+            # Streamed as soon as this subquery finishes, not when the slowest one does
+            self._emit_result(write, index, decomposed_query, result)
+            return result
+
+        results = await asyncio.gather(
+            *(run(index, query, context) for index, (query, context) in enumerate(zip(decomposed_queries, contexts))),
+            return_exceptions=True
+        )
+        return self._merge_outputs(state, decomposed_queries, results)
+
+    @staticmethod
+    def _stream_writer() -> Callable[[Any], None]:
+        """LangGraph custom-stream writer of the current run, or a no-op outside a graph run"""
+        try:
+            return get_stream_writer()
+        except Exception:
+            return lambda chunk: None
+
+    @staticmethod
+    def _emit_result(write: Callable[[Any], None], index: int, decomposed_query: str, result: Any) -> None:
+        if isinstance(result, BaseException):
+            write({"event": "subquery_error", "data": {"index": index, "query": decomposed_query, "error": str(result)}})
+        else:
+            write({"event": "result", "data": {"index": index, "query": decomposed_query, "output": result}})
+
+    def _merge_outputs(self, state: AgentState, decomposed_queries: List[str], results: List[Any]) -> AgentState:
+        """Keep successful results in subquery order and record failures without dropping the rest"""
+        agent_output_list = []
+        subquery_errors = []
+        for decomposed_query, query_result in zip(decomposed_queries, results):
+            if isinstance(query_result, BaseException):
+                print(f"MainAgent failed for '{decomposed_query}': {query_result}")
+                subquery_errors.append({"query": decomposed_query, "error": str(query_result)})
+            else:
                 agent_output_list.append(query_result)
-                
-            state["agent_output"] = agent_output_list
-        except Exception as e:
-            state["agent_output"] = []  # Fallback to empty list on error
+
+        state["agent_output"] = agent_output_list
+        state["subquery_errors"] = subquery_errors
         return state
     
     def finalize_output(self, state: AgentState) -> AgentState:
@@ -187,49 +422,165 @@ class AgentExecutor:
             "end_message": state.get("end_message", "Thank you for your query!"),
             "ai_question": state.get("ai_question", ""),
             "clarification_needed": state.get("clarification_needed", False),
+            "subquery_errors": state.get("subquery_errors", []),
+            "context_tokens": state.get("context_tokens", []),
         }
         
         state["agent_output"] = response
         return state
     
-    def invoke(self, user_query: str) -> Dict[str, Any]:
+    def invoke(self, user_query: str, role_id: int = 1) -> Dict[str, Any]:
         """
         Execute the agent workflow
         
         Args:
             user_query: The user's input query
+            role_id: Role of the caller, used for the response cache key and RAG role filter
             
         Returns:
             Dict containing the processed results
         """
         try:
             if not user_query or not user_query.strip():
-                return {
-                    "original_query": user_query,
-                    "normalized_query": "",
-                    "decomposed_queries": [],
-                    "rag_contexts": [],
-                    "error": "Empty query provided"
-                }
-            
-            initial_state = AgentState(
-                query=user_query.strip(),
-                normalized_query="",
-                rag_contexts=[],
-                decomposed_queries=[],
-                agent_output=""
-            )
+                return self._error_response(user_query, "Empty query provided")
+
+            started = time.perf_counter()
+            cached = AgentResponseCache.get(user_query, role_id)
+            if cached is not None:
+                Metrics.observe(REQUEST_DURATION, time.perf_counter() - started, cache="hit")
+                return cached
             
-            result = self.workflow.invoke(initial_state)
+            result = self.workflow.invoke(self._initial_state(user_query, role_id))
+            Metrics.observe(REQUEST_DURATION, time.perf_counter() - started, cache="miss")
+            if self._is_cacheable(result):
+                AgentResponseCache.set(user_query, role_id, result["agent_output"])
             return result["agent_output"]
             
         except Exception as e:
-            return {
-                "original_query": user_query,
-                "normalized_query": "",
-                "decomposed_queries": [],
-                "rag_contexts": [],
-                "error": f"Workflow execution failed: {str(e)}"
-            }
-    
-    
\ No newline at end of file
+            return self._error_response(user_query, f"Workflow execution failed: {str(e)}")
+
+    async def ainvoke(self, user_query: str, role_id: int = 1) -> Dict[str, Any]:
+        """
+        Execute the agent workflow asynchronously
+        
+        Args:
+            user_query: The user's input query
+            role_id: Role of the caller, used for the response cache key and RAG role filter
+            
+        Returns:
+            Dict containing the processed results
+        """
+        try:
+            if not user_query or not user_query.strip():
+                return self._error_response(user_query, "Empty query provided")
+
+            started = time.perf_counter()
+            cached = AgentResponseCache.get(user_query, role_id)
+            if cached is not None:
+                Metrics.observe(REQUEST_DURATION, time.perf_counter() - started, cache="hit")
+                return cached
+
+            # Per-run signal the greeting branch uses to cancel the translation branch
+            config = {"configurable": {"greeting_signal": asyncio.Event()}}
+            result = await self.workflow.ainvoke(self._initial_state(user_query, role_id), config=config)
+            Metrics.observe(REQUEST_DURATION, time.perf_counter() - started, cache="miss")
+            if self._is_cacheable(result):
+                AgentResponseCache.set(user_query, role_id, result["agent_output"])
+            return result["agent_output"]
+
+        except Exception as e:
+            return self._error_response(user_query, f"Workflow execution failed: {str(e)}")
+
+    async def astream(self, user_query: str, role_id: int = 1) -> AsyncIterator[Dict[str, Any]]:
+        """
+        Execute the agent workflow and yield events as they become available
+
+        Events are {"event": name, "data": payload} dicts:
+            greeting / clarification: the early answer when the query stops before decomposition
+            result / subquery_error: one per decomposed query, in completion order
+            final: the same envelope invoke()/ainvoke() return
+            error: the workflow failed; no final event follows
+
+        Args:
+            user_query: The user's input query
+            role_id: Role of the caller, used for the response cache key and RAG role filter
+        """
+        if not user_query or not user_query.strip():
+            yield {"event": "error", "data": self._error_response(user_query, "Empty query provided")}
+            return
+
+        started = time.perf_counter()
+        cached = AgentResponseCache.get(user_query, role_id)
+        if cached is not None:
+            Metrics.observe(REQUEST_DURATION, time.perf_counter() - started, cache="hit")
+            yield {"event": "final", "data": cached}
+            return
+
+        try:
+            config = {"configurable": {"greeting_signal": asyncio.Event()}}
+            final_state = None
+            async for mode, chunk in self.workflow.astream(
+                self._initial_state(user_query, role_id), config=config,
+                stream_mode=["updates", "custom", "values"],
+            ):
+                if mode == "custom":
+                    yield chunk
+                elif mode == "values":
+                    final_state = chunk
+                else:
+                    early = self._early_event(chunk)
+                    if early is not None:
+                        yield early
+        except Exception as e:
+            yield {"event": "error", "data": self._error_response(user_query, f"Workflow execution failed: {str(e)}")}
+            return
+
+        Metrics.observe(REQUEST_DURATION, time.perf_counter() - started, cache="miss")
+        if self._is_cacheable(final_state):
+            AgentResponseCache.set(user_query, role_id, final_state["agent_output"])
+        yield {"event": "final", "data": final_state["agent_output"]}
+
+    @staticmethod
+    def _is_cacheable(state: Dict[str, Any]) -> bool:
+        """
+        Only complete answers are cached
+
+        A run where a node fell back after an error, a subquery failed, or
+        retrieval came back empty (RagRetriever returns [] on Chroma or embedding
+        errors) would otherwise be replayed until the index version changes.
+        """
+        if state.get("node_errors") or state.get("subquery_errors"):
+            return False
+        output = state.get("agent_output")
+        if state.get("isQueryGreeting") is True or state.get("is_ambiguous") is True:
+            return bool(output)
+        return bool(state.get("rag_contexts")) and isinstance(output, dict) and bool(output.get("agent_output"))
+
+    def _early_event(self, update: Dict[str, Any]) -> Any:
+        """Greeting or clarification event for a node update that ends the CRM path"""
+        for node, values in update.items():
+            values = values or {}
+            if node == "greeting_query_checker" and values.get("isQueryGreeting") is True:
+                return {"event": "greeting", "data": values.get("agent_output")}
+            if node == "response_with_ai_message" and values.get("is_ambiguous") is True:
+                return {"event": "clarification", "data": values.get("agent_output")}
+        return None
+
+    def _initial_state(self, user_query: str, role_id: int = 1) -> AgentState:
+        return AgentState(
+            query=user_query.strip(),
+            role_id=role_id,
+            normalized_query="",
+            rag_contexts=[],
+            decomposed_queries=[],
+            agent_output=""
+        )
+
+    def _error_response(self, user_query: str, error: str) -> Dict[str, Any]:
+        return {
+            "original_query": user_query,
+            "normalized_query": "",
+            "decomposed_queries": [],
+            "rag_contexts": [],
+            "error": error
+        }
@@ -0,0 +1,138 @@
+import json
+import threading
+from typing import Any, Dict, List
+
+from agents.rag_builder.lexical_index import LexicalIndex
+
+
+class ContextSerializer:
+    """
+    Turns the RAG documents retrieved for one subquery into the compact text
+    MainAgent receives as {context}.
+
+    Each pattern becomes one line (text, object, intent, format, limit and the
+    API names it uses) and every distinct field is listed once in a
+    pipe-separated table instead of repeating Document/dict reprs per pattern.
+    """
+
+    FIELD_COLUMNS = ("object_name", "field_id", "name", "FieldName", "field_type")
+
+    _encoder = None
+    _encoder_lock = threading.Lock()
+    _encoder_failed = False
+
+    @classmethod
+    def contexts_for(cls, rag_contexts: List[Dict[str, Any]], query: str) -> List[Any]:
+        """Documents retrieved for this subquery only"""
+        for entry in rag_contexts or []:
+            if entry.get("query") == query:
+                return entry.get("contexts") or []
+        return []
+
+    @staticmethod
+    def _cell(value: Any) -> str:
+        return str(value if value is not None else "").replace("|", "/").replace("\n", " ").strip()
+
+    @classmethod
+    def _field_ref(cls, field: Dict[str, Any]) -> str:
+        return cls._cell(field.get("FieldName") or field.get("name"))
+
+    @staticmethod
+    def _collect_fields(fields: Dict[tuple, Dict[str, Any]], entries: List[Dict[str, Any]], metadata: Dict[str, Any]) -> None:
+        for field in entries:
+            object_name = field.get("object_name") or metadata.get("object_name")
+            fields.setdefault((object_name, field.get("FieldName") or field.get("name")), dict(field, object_name=object_name))
+
+    @staticmethod
+    def _order_entry(metadata: Dict[str, Any]) -> Dict[str, Any]:
+        order = metadata.get("order")
+        if isinstance(order, str) and order.startswith("{"):
+            try:
+                order = json.loads(order)
+            except ValueError:
+                return {}
+        if not isinstance(order, dict) or not isinstance(order.get("field"), dict):
+            return {}
+        return order
+
+    @classmethod
+    def serialize(cls, documents: List[Any]) -> str:
+        """
+        Serialize documents into pattern lines plus one deduplicated field table
+
+        Args:
+            documents: LangChain Documents with cleaned RAG metadata
+
+        Returns:
+            str: Compact context text, or an empty string when there is nothing to show
+        """
+        pattern_lines = []
+        seen_patterns = set()
+        fields: Dict[tuple, Dict[str, Any]] = {}
+
+        for doc in documents:
+            metadata = doc.metadata or {}
+            data_fields = LexicalIndex.field_entries(metadata, "data_fields")
+            cls._collect_fields(fields, data_fields, metadata)
+
+            parts = [
+                f'"{" ".join(doc.page_content.split())}"',
+                f"object={metadata.get('object_name', '')}",
+                f"intent={metadata.get('intent', '')}",
+                f"format={metadata.get('output_format', '')}",
+            ]
+            if metadata.get("limit") not in (None, ""):
+                parts.append(f"limit={metadata['limit']}")
+            parts.append("fields=" + ",".join(cls._field_ref(field) for field in data_fields))
+            for key in ("filters", "groupBy"):
+                entries = LexicalIndex.field_entries(metadata, key)
+                cls._collect_fields(fields, entries, metadata)
+                if entries:
+                    parts.append(f"{key}=" + ",".join(cls._field_ref(entry) for entry in entries))
+            order = cls._order_entry(metadata)
+            if order:
+                cls._collect_fields(fields, [order["field"]], metadata)
+                parts.append(f"order={cls._field_ref(order['field'])} {order.get('direction', '')}".rstrip())
+
+            line = "- " + " ".join(parts)
+            if line not in seen_patterns:
+                seen_patterns.add(line)
+                pattern_lines.append(line)
+
+        if not pattern_lines:
+            return ""
+
+        lines = ["Patterns:"] + pattern_lines
+        lines.append("Fields (" + "|".join(cls.FIELD_COLUMNS) + "):")
+        for field in fields.values():
+            lines.append("|".join(cls._cell(field.get(column)) for column in cls.FIELD_COLUMNS))
+        return "\n".join(lines)
+
+    @classmethod
+    def load_encoder(cls) -> bool:
+        """
+        Load the gpt-4o tokenizer once, at startup
+
+        tiktoken downloads the encoding on first use, so this must not run on a
+        request path. When it cannot be loaded (e.g. offline) count_tokens keeps
+        using the chars/4 estimate.
+
+        Returns:
+            bool: True when the tokenizer is available
+        """
+        with cls._encoder_lock:
+            if cls._encoder is None and not cls._encoder_failed:
+                try:
+                    import tiktoken
+                    cls._encoder = tiktoken.get_encoding("o200k_base")
+                except Exception as e:
+                    cls._encoder_failed = True
+                    print(f"Tokenizer unavailable, estimating token counts: {e}")
+            return cls._encoder is not None
+
+    @classmethod
+    def count_tokens(cls, text: str) -> int:
+        """Token count with the tokenizer loaded by load_encoder(), or a chars/4 estimate"""
+        if cls._encoder is not None:
+            return len(cls._encoder.encode(text or ""))
+        return (len(text or "") + 3) // 4
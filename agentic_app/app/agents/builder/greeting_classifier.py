@@ -0,0 +1,126 @@
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from enum_helper.object_synonyms import build_object_vocabulary, crm_terms, crm_actions
+
+
+class GreetingClassifier:
+    """
+    Deterministic greeting / CRM pre-classifier that runs before GrettingAgent.
+
+    It answers locally when the query is clearly a greeting ("hi", "good morning"),
+    a thank-you or a farewell, each with its own reply, or clearly a CRM request (mentions an object such as leads or cases, or starts
+    with a data verb). Anything in between returns None and is sent to the LLM.
+    """
+
+    GREETING_PHRASES = [
+        "good morning", "good afternoon", "good evening", "good day",
+        "how are you", "how r u", "how are u", "how is it going", "how do you do",
+        "what's up", "whats up", "nice to meet you",
+        "hi", "hii", "hiii", "hello", "helo", "hey", "heya", "hiya", "howdy",
+        "greetings", "yo", "sup", "namaste", "namaskar", "hola",
+    ]
+    THANKS_PHRASES = ["thank you", "thank u", "thanks", "thanx", "thx", "cheers", "dhanyavad", "shukriya"]
+    FAREWELL_PHRASES = ["bye", "bye bye", "goodbye", "good bye", "see you", "see ya", "good night", "take care"]
+
+    # Words that may surround a greeting without turning it into a request
+    FILLER_WORDS = {
+        "there", "team", "bot", "assistant", "buddy", "friend", "sir", "madam",
+        "ji", "dear", "all", "everyone", "again", "so", "much", "a", "lot",
+        "very", "and", "you", "u", "today", "doing", "crm",
+    }
+
+    GREETING_REPLY = (
+        "Hello! I am doing great, thank you. How can I help you today? "
+        "I am your CRM Assistant, please ask me something about CRM"
+    )
+    THANKS_REPLY = "You're welcome! Let me know if there is anything else I can help you with in your CRM"
+    FAREWELL_REPLY = "Goodbye! Come back any time you need help with your CRM"
+
+    _object_vocabulary = build_object_vocabulary()
+    _crm_words = set(crm_terms)
+    _crm_actions = set(crm_actions)
+    _greeting_pattern = re.compile(
+        r"\b(" + "|".join(
+            re.escape(p) for p in sorted(GREETING_PHRASES + THANKS_PHRASES + FAREWELL_PHRASES, key=len, reverse=True)
+        ) + r")\b"
+    )
+
+    _lock = threading.Lock()
+    _stats = {"local_greeting": 0, "local_crm": 0, "llm_fallback": 0}
+
+    @classmethod
+    def tokenize(cls, text: str) -> List[str]:
+        return re.findall(r"[\w']+", text.casefold())
+
+    @classmethod
+    def find_objects(cls, tokens: List[str]) -> List[str]:
+        """Return the object_list names referenced by the tokens, in order of appearance"""
+        found = []
+        bigrams = [f"{a} {b}" for a, b in zip(tokens, tokens[1:])]
+        for word in bigrams + tokens:
+            object_name = cls._object_vocabulary.get(word)
+            if object_name and object_name not in found:
+                found.append(object_name)
+        return found
+
+    @classmethod
+    def classify(cls, user_query: str) -> Optional[Dict[str, Any]]:
+        """
+        Classify a query without calling the LLM
+
+        Args:
+            user_query: Raw user input
+
+        Returns:
+            Optional[Dict[str, Any]]: The same {"greeting", "greetingReply"} shape GrettingAgent
+            returns when the answer is certain, otherwise None
+        """
+        text = (user_query or "").casefold().strip()
+        tokens = cls.tokenize(text)
+        if not tokens:
+            return cls._fallback()
+
+        if cls.find_objects(tokens) or cls._crm_words.intersection(tokens):
+            return cls._record("local_crm", {"greeting": "NO", "greetingReply": ""})
+
+        phrases = set(cls._greeting_pattern.findall(text))
+        if phrases:
+            remainder = cls.tokenize(cls._greeting_pattern.sub(" ", text))
+            if all(word in cls.FILLER_WORDS for word in remainder):
+                return cls._record("local_greeting", {"greeting": "YES", "greetingReply": cls.reply_for(phrases)})
+        elif tokens[0] in cls._crm_actions:
+            return cls._record("local_crm", {"greeting": "NO", "greetingReply": ""})
+
+        return cls._fallback()
+
+    @classmethod
+    def reply_for(cls, phrases) -> str:
+        """A farewell or thank-you gets its own reply, even when it follows a greeting"""
+        if phrases.intersection(cls.FAREWELL_PHRASES):
+            return cls.FAREWELL_REPLY
+        if phrases.intersection(cls.THANKS_PHRASES):
+            return cls.THANKS_REPLY
+        return cls.GREETING_REPLY
+
+    @classmethod
+    def _record(cls, counter: str, result: Dict[str, Any]) -> Dict[str, Any]:
+        with cls._lock:
+            cls._stats[counter] += 1
+        return result
+
+    @classmethod
+    def _fallback(cls) -> None:
+        with cls._lock:
+            cls._stats["llm_fallback"] += 1
+        return None
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        with cls._lock:
+            stats = dict(cls._stats)
+        total = sum(stats.values())
+        stats["llm_calls_avoided"] = stats["local_greeting"] + stats["local_crm"]
+        stats["local_ratio"] = round(stats["llm_calls_avoided"] / total, 4) if total else 0.0
+        return stats
@@ -1,6 +1,8 @@
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from agents.llm_factory import LLMFactory
+from agents.builder.greeting_classifier import GreetingClassifier
+from agents.usage_tracker import UsageTracker
 
 
 class GrettingAgent:
@@ -27,25 +29,43 @@ class GrettingAgent:
         "greeting": "YES",
         "greetingReply": "Hello! I am doing great, thank you. How can I help you today?, I am your CRM Assistent please ask me somthing about CRM"
         }}
-
-
-        Now, normalize this user query:
-        {user_query}
         """
+        # Static instructions first so the provider can reuse the cached prefix
         return ChatPromptTemplate.from_messages([
-            ("system", system_prompt)
+            ("system", system_prompt),
+            ("human", "Now, normalize this user query:\n{user_query}")
         ])
     
+    @classmethod
+    def get_chain(cls):
+        chain = cls.get_prompt() | LLMFactory.open_ai() | JsonOutputParser()
+        return chain.with_config(callbacks=[UsageTracker.callback("greeting_agent")])
+
     @classmethod
     def invoke(cls, user_query: str) -> str:
-        prompt = cls.get_prompt()
-        
+        # Clear greetings and clear CRM requests are answered locally
+        local_result = GreetingClassifier.classify(user_query)
+        if local_result is not None:
+            return local_result
+
         print("Invoking QueryTranslator with user_query:", user_query)
-        chain = prompt | LLMFactory.open_ai() | JsonOutputParser()
+        chain = cls.get_chain()
         print("Chain created, invoking...")
         
         updated_query = chain.invoke({"user_query": user_query})
         print("QueryTranslator output:", updated_query)
         return updated_query
 
+    @classmethod
+    async def ainvoke(cls, user_query: str) -> dict:
+        """Async counterpart of invoke used by the async agent graph"""
+        local_result = GreetingClassifier.classify(user_query)
+        if local_result is not None:
+            return local_result
+
+        chain = cls.get_chain()
+        result = await chain.ainvoke({"user_query": user_query})
+        print("GrettingAgent output:", result)
+        return result
+
     
@@ -6,19 +6,17 @@ from agents.controllers.structured_output import (
 )
 from typing import Any
 from agents.tools.base_tool import create_tools
+from agents.usage_tracker import UsageTracker
 
 class MainAgent:
     
-    def __init__(self):
-        self.llm = LLMFactory().open_ai()
+    def __init__(self, llm=None):
+        self.llm = llm if llm is not None else LLMFactory().open_ai()
 
     def get_prompt(self) -> ChatPromptTemplate:
         system_prompt = """
         You are an intelligent CRM assistant specializing in analyzing and processing user queries about CRM data.
-        
-        ### Available Context
-        The following context contains the available CRM data fields and their descriptions:
-        {context}
+        The available CRM data fields and their descriptions are provided with the query under "Available Context".
 
         ### Available Tools
         Use these tools to get field information:
@@ -77,35 +75,45 @@ class MainAgent:
            - Field names and IDs match the context exactly
            - Appropriate welcome and open-end messages
            - Correct intent and output format
-        
+        """
+        # Everything that changes per request (context, query) comes after the
+        # static instructions, keeping the prompt prefix identical across calls
+        user_prompt = """
+        ### Available Context
+        The following context contains the available CRM data fields and their descriptions:
+        {context}
+
         Now, analyze this query using the provided context:
         {user_query}
         """
         return ChatPromptTemplate.from_messages([
-            ("system", system_prompt)
+            ("system", system_prompt),
+            ("human", user_prompt)
         ])
 
+    def get_chain(self):
+        # Create the LLM chain with structured output and tools
+        # llm = self.llm.with_structured_output(OutputSchema)
+        # chain = prompt | llm.bind_tools(create_tools()) | JsonOutputParser()
+        
+        llm_with_tools = self.llm.bind_tools(create_tools())
+        llm_structured = llm_with_tools.with_structured_output(OutputSchema)
+        
+        chain = self.get_prompt() | llm_structured
+        return chain.with_config(callbacks=[UsageTracker.callback("main_agent")])
+
     def invoke(self, query: str, context: Any) -> OutputSchema:
         """
         Process a user query to generate structured CRM operation schemas
         
         Args:
             query: The user's CRM query to analyze
-            state: Current agent state containing context and history
+            context: Compact RAG context for this query, built by ContextSerializer
             
         Returns:
             AgentSchema: Complete response including welcome message, output schemas, and follow-up suggestions
         """
-        prompt = self.get_prompt()
-        
-        # Create the LLM chain with structured output and tools
-        # llm = self.llm.with_structured_output(OutputSchema)
-        # chain = prompt | llm.bind_tools(create_tools()) | JsonOutputParser()
-        
-        llm_with_tools = self.llm.bind_tools(create_tools())
-        llm_structured = llm_with_tools.with_structured_output(OutputSchema)
-        
-        chain = prompt | llm_structured
+        chain = self.get_chain()
         
         # Execute chain with proper context and query
         result = chain.invoke({
@@ -117,4 +125,13 @@ class MainAgent:
         print("Generated response:", result)
         return result
 
-    
+    async def ainvoke(self, query: str, context: Any) -> OutputSchema:
+        """Same as invoke, but awaits the structured-output chain"""
+        chain = self.get_chain()
+        result = await chain.ainvoke({
+            "user_query": query,
+            "context": context
+        })
+        
+        print(f"Main Agent processing query: '{query}'")
+        return result
@@ -3,6 +3,7 @@ from typing import Literal, TypedDict
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import JsonOutputParser
 from agents.llm_factory import LLMFactory
+from agents.usage_tracker import UsageTracker
 
 class QueryAmbiguityCheckerState(TypedDict):
     """Type definition for query ambiguity checker output"""
@@ -81,15 +82,20 @@ class QueryAmbiguityChecker:
             "is_ambiguous": "YES",
             "ai_question": "Which case do you want to check the status for? Please provide the case ID or subject."
         }}
-        
-
-        Now, normalize this user query:
-        {normalized_query}
         """
+        # The query is sent as its own message after the static examples
         return ChatPromptTemplate.from_messages([
-            ("system", system_prompt)
+            ("system", system_prompt),
+            ("human", "Now, normalize this user query:\n{normalized_query}")
         ])
     
+    @classmethod
+    def get_chain(cls):
+        llm = LLMFactory.open_ai()
+        structured_llm = llm.with_structured_output(QueryAmbiguityCheckerState)
+        chain = cls.get_query_parse_prompt() | structured_llm
+        return chain.with_config(callbacks=[UsageTracker.callback("query_ambiguity_checker")])
+
     @classmethod
     def invoke(cls, normalized_query: str) -> QueryAmbiguityCheckerState:
         """
@@ -101,13 +107,8 @@ class QueryAmbiguityChecker:
         Returns:
             QueryAmbiguityCheckerState: The processed query state with normalization and ambiguity check
         """
-        prompt = cls.get_query_parse_prompt()
-        
-        llm = LLMFactory.open_ai()
-        structured_llm = llm.with_structured_output(QueryAmbiguityCheckerState)
-
         print("Invoking QueryAmbiguityChecker with user_query:", normalized_query)
-        chain = prompt | structured_llm
+        chain = cls.get_chain()
         print("Chain created, invoking...")
         
         result = chain.invoke({"normalized_query": normalized_query})
@@ -116,4 +117,12 @@ class QueryAmbiguityChecker:
         # Ensure we return the full QueryAmbiguityCheckerState
         return result
 
+    @classmethod
+    async def ainvoke(cls, normalized_query: str) -> QueryAmbiguityCheckerState:
+        """Run the ambiguity check through chain.ainvoke"""
+        chain = cls.get_chain()
+        result = await chain.ainvoke({"normalized_query": normalized_query})
+        print("QueryAmbiguityChecker output:", result)
+        return result
+
     
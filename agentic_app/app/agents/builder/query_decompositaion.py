@@ -1,7 +1,10 @@
+import ast
 from agents.controllers.structured_output import AgentSchema
 from langchain_core.prompts import ChatPromptTemplate
 from agents.llm_factory import LLMFactory
 from langchain_core.output_parsers import StrOutputParser
+from agents.usage_tracker import UsageTracker
+from agents.builder.rule_decomposer import RuleDecomposer
 
 
 class QueryDecomposition:
@@ -77,25 +80,55 @@ class QueryDecomposition:
             "show my open leads",
             "show my activities where ActivityId == LeadIdActivityId"
             ]
-
-            Now, decompose this normalized query:
-            "{normalized_query}"
             """
-        return ChatPromptTemplate.from_messages([("system", query_normalizer_prompt)])
+        # The user text goes last so every request shares the same instruction prefix
+        return ChatPromptTemplate.from_messages([
+            ("system", query_normalizer_prompt),
+            ("human", 'Now, decompose this normalized query:\n"{normalized_query}"')
+        ])
+
+    @classmethod
+    def get_chain(cls):
+        chain = cls.get_query_decompose_prompt() | LLMFactory.open_ai() | StrOutputParser()
+        return chain.with_config(callbacks=[UsageTracker.callback("query_decomposition")])
 
     @classmethod
-    def invoke(cls, user_query: str) -> str:
-        
+    def invoke(cls, user_query: str) -> list:
+        # Single-object and plain conjunction queries are split locally
+        local_result = RuleDecomposer.decompose(user_query)
+        if local_result is not None:
+            return local_result
+
         print("The original user query for decomposition is:", user_query)
-        prompt = cls.get_query_decompose_prompt()
-        chain = prompt |  LLMFactory.open_ai() | StrOutputParser()
+        chain = cls.get_chain()
         response = chain.invoke({"normalized_query": user_query})
         print("The decomposed query response is:", response)
+        return cls.parse_response(response)
+
+    @classmethod
+    async def ainvoke(cls, user_query: str) -> list:
+        """Decompose the query using the async LLM call"""
+        local_result = RuleDecomposer.decompose(user_query)
+        if local_result is not None:
+            return local_result
+
+        chain = cls.get_chain()
+        response = await chain.ainvoke({"normalized_query": user_query})
+        print("The decomposed query response is:", response)
+        return cls.parse_response(response)
+
+    @classmethod
+    def parse_response(cls, response: str) -> list:
+        text = response.strip()
+        if text.startswith("```"):
+            text = text.strip("`").strip()
+            if text.startswith("python"):
+                text = text[len("python"):].strip()
         try:
-            # Safely evaluate list-like string output
-            result = eval(response.strip())
+            # Parse the list literal only; model output is never executed
+            result = ast.literal_eval(text)
             if isinstance(result, list):
-                return result
+                return [str(item) for item in result]
             return [response.strip()]
         except Exception:
             return [response.strip()]
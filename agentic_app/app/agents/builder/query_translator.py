@@ -1,6 +1,7 @@
 from langchain_core.prompts import ChatPromptTemplate
 from langchain_core.output_parsers import StrOutputParser
 from agents.llm_factory import LLMFactory
+from agents.usage_tracker import UsageTracker
 
 class QueryTranslator:
         
@@ -22,24 +23,34 @@ class QueryTranslator:
         - Output only the corrected, normalized natural language query.
         - Do not change the intent.
         - Use proper English grammar.
-
-        Now, normalize this user query:
-        {user_query}
         """
+        # Static instructions first so the provider can reuse the cached prefix
         return ChatPromptTemplate.from_messages([
-            ("system", system_prompt)
+            ("system", system_prompt),
+            ("human", "Now, normalize this user query:\n{user_query}")
         ])
     
+    @classmethod
+    def get_chain(cls):
+        chain = cls.get_query_parse_prompt() | LLMFactory.open_ai() | StrOutputParser()
+        return chain.with_config(callbacks=[UsageTracker.callback("query_translator")])
+
     @classmethod
     def invoke(cls, user_query: str) -> str:
-        prompt = cls.get_query_parse_prompt()
-        
         print("Invoking QueryTranslator with user_query:", user_query)
-        chain = prompt | LLMFactory.open_ai() | StrOutputParser()
+        chain = cls.get_chain()
         print("Chain created, invoking...")
         
         updated_query = chain.invoke({"user_query": user_query})
         print("QueryTranslator output:", updated_query)
         return updated_query
 
+    @classmethod
+    async def ainvoke(cls, user_query: str) -> str:
+        """Translate the query without blocking the event loop"""
+        chain = cls.get_chain()
+        updated_query = await chain.ainvoke({"user_query": user_query})
+        print("QueryTranslator output:", updated_query)
+        return updated_query
+
     
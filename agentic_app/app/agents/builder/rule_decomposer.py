@@ -0,0 +1,119 @@
+import re
+import threading
+from typing import Any, Dict, List, Optional
+
+from agents.builder.greeting_classifier import GreetingClassifier
+from enum_helper.object_synonyms import crm_actions
+
+
+class RuleDecomposer:
+    """
+    Deterministic decomposer that runs before the QueryDecomposition LLM call.
+
+    A query about a single object is returned unchanged, and objects joined only
+    by conjunctions ("leads and cases", "10 leads, 5 accounts") are split into one
+    query each. Relational queries ("leads and their activities", "accounts
+    related to leadid 12") and anything it cannot split cleanly return None and
+    go to the LLM, which knows how to express the join keys.
+    """
+
+    CONJUNCTION_PATTERN = re.compile(
+        r"\s*(?:,|&|\band also\b|\bas well as\b|\balong with\b|\btogether with\b|\band\b|\bplus\b|\balso\b)\s*",
+        re.IGNORECASE,
+    )
+
+    RELATION_WORDS = {
+        "their", "its", "his", "her", "related", "relate", "relation", "relations",
+        "relationship", "associated", "linked", "belonging", "belongs", "whose",
+        "under", "per", "each", "against", "corresponding",
+    }
+
+    # Records the LLM prompt knows about that are not in object_list
+    OTHER_RECORD_WORDS = {
+        "quote", "quotes", "invoice", "invoices", "solution", "solutions",
+        "campaign", "campaigns", "user", "users", "team", "teams",
+    }
+
+    # crm_actions that modify the object ("open leads") rather than start the request
+    MODIFIER_ACTIONS = {"top", "bottom", "latest", "open", "closed"}
+    LEAD_IN_WORDS = {"me", "my", "all", "the", "our", "us", "mere", "mera", "meri"}
+
+    _verbs = set(crm_actions) - MODIFIER_ACTIONS
+
+    _lock = threading.Lock()
+    _stats = {"local_single": 0, "local_split": 0, "llm_fallback": 0}
+
+    @classmethod
+    def decompose(cls, normalized_query: str) -> Optional[List[str]]:
+        """
+        Decompose a query without calling the LLM
+
+        Args:
+            normalized_query: Output of QueryTranslator
+
+        Returns:
+            Optional[List[str]]: Subqueries in the same shape QueryDecomposition returns
+            when the split is certain, otherwise None
+        """
+        text = " ".join((normalized_query or "").split())
+        tokens = GreetingClassifier.tokenize(text)
+        if not tokens or cls._is_relational(tokens) or cls.OTHER_RECORD_WORDS.intersection(tokens):
+            return cls._fallback()
+
+        objects = GreetingClassifier.find_objects(tokens)
+        if len(objects) == 1:
+            return cls._record("local_single", [text])
+        if not objects:
+            return cls._fallback()
+
+        segments = [segment for segment in cls.CONJUNCTION_PATTERN.split(text) if segment.strip()]
+        segment_objects = [GreetingClassifier.find_objects(GreetingClassifier.tokenize(segment)) for segment in segments]
+        if len(segments) != len(objects) or any(len(found) != 1 for found in segment_objects):
+            return cls._fallback()
+
+        lead_in = cls._lead_in(segments[0])
+        subqueries = []
+        for segment in segments:
+            first_word = GreetingClassifier.tokenize(segment)[0]
+            subqueries.append(segment if first_word in cls._verbs or not lead_in else f"{lead_in} {segment}")
+        return cls._record("local_split", subqueries)
+
+    @classmethod
+    def _is_relational(cls, tokens: List[str]) -> bool:
+        """Relationship words, or key references such as "leadid" that need join expressions"""
+        if cls.RELATION_WORDS.intersection(tokens):
+            return True
+        for token in tokens:
+            if len(token) > 2 and token.endswith("id") and GreetingClassifier.find_objects([token[:-2]]):
+                return True
+        return False
+
+    @classmethod
+    def _lead_in(cls, segment: str) -> str:
+        """Leading verb and possessive words ("show my") shared by every split subquery"""
+        words = segment.split()
+        count = 0
+        while count < len(words) and words[count].casefold() in cls._verbs | cls.LEAD_IN_WORDS:
+            count += 1
+        return " ".join(words[:count])
+
+    @classmethod
+    def _record(cls, counter: str, result: List[str]) -> List[str]:
+        with cls._lock:
+            cls._stats[counter] += 1
+        return result
+
+    @classmethod
+    def _fallback(cls) -> None:
+        with cls._lock:
+            cls._stats["llm_fallback"] += 1
+        return None
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        with cls._lock:
+            stats = dict(cls._stats)
+        total = sum(stats.values())
+        stats["llm_calls_avoided"] = stats["local_single"] + stats["local_split"]
+        stats["local_ratio"] = round(stats["llm_calls_avoided"] / total, 4) if total else 0.0
+        return stats
@@ -1,21 +1,57 @@
+import json
 from fastapi import APIRouter
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
 from agents.rag_builder.rag_builder import RagBuilder
-#from agents.rag_builder.rag_retriver import RagRetriever
+from agents.rag_builder.rag_retriver import RagRetriever
 from agents.rag_builder.vector_store import VectorStore
 from agents.builder.agent_runner import AgentRunner
 #from agents.builder.query_normalizer import QueryNormalizerAgent
-from agents.builder.agent_graph import AgentExecutor
-from agents.builder.query_translator import QueryTranslator
-from agents.builder.main_agent import MainAgent
+from agents.agent_registry import AgentRegistry
+from agents.builder.greeting_classifier import GreetingClassifier
+from agents.builder.rule_decomposer import RuleDecomposer
+from agents.tools.field_catalog import FieldCatalog
+from agents.response_cache import AgentResponseCache
+from agents.llm_factory import LLMFactory
+from agents.usage_tracker import UsageTracker
 
 router = APIRouter()
 
 @router.get("/invoke_agent_executor")
-def query_normalize_agent(user_query:str):
+async def query_normalize_agent(user_query:str, role_id: int = 1):
 
-    normalized_query = AgentExecutor().invoke(user_query)
+    normalized_query = await AgentRegistry.get_executor().ainvoke(user_query, role_id)
     return {"response": normalized_query}   
 
+@router.get("/stream_agent_executor")
+async def stream_agent_executor(user_query: str, role_id: int = 1):
+    """Server-sent events: greeting/clarification, one result per subquery as it completes, then final"""
+
+    async def events():
+        async for event in AgentRegistry.get_executor().astream(user_query, role_id):
+            payload = json.dumps(jsonable_encoder(event["data"]))
+            yield f"event: {event['event']}\ndata: {payload}\n\n"
+
+    return StreamingResponse(
+        events(),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"},
+    )
+
+@router.get("/agent_stats")
+def agent_stats():
+    return {
+        "registry": AgentRegistry.stats(),
+        "greeting_classifier": GreetingClassifier.stats(),
+        "rule_decomposer": RuleDecomposer.stats(),
+        "response_cache": AgentResponseCache.stats(),
+        "embedding_cache": LLMFactory.embedding_cache_stats(),
+        "llm_clients": LLMFactory.client_stats(),
+        "llm_usage": UsageTracker.stats(),
+        "retriever": RagRetriever.stats(),
+        "field_catalog": FieldCatalog.stats(),
+    }
+
 @router.get("/greeting_agent")
 def greeting_agent(user_query:str):
 
@@ -26,6 +62,7 @@ def greeting_agent(user_query:str):
 def delete_vector_store():
     rag_builder = VectorStore()
     success = rag_builder.delete_vector_store(force=True)
+    AgentRegistry.reload_retriever()
     if success:
         return {"message": "Vector store deleted successfully"}
     else:
@@ -36,6 +73,7 @@ def delete_vector_store():
 def create_vector_store():
     rag_builder = RagBuilder()
     docs = rag_builder.build_documents()
+    AgentRegistry.reload_retriever()
     return {"listing": "listing file has been created", "documents": docs}
 
 
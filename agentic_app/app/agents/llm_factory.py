@@ -1,32 +1,163 @@
 from langchain_openai import ChatOpenAI
 from langchain_openai import OpenAIEmbeddings
+from agents.rag_builder.cached_embeddings import CachedEmbeddings
+from agents.rag_builder.hashing_embeddings import HashingEmbeddings
+from config import EMBEDDING_CACHE_SIZE, EMBEDDING_CACHE_PATH, EMBEDDING_PROVIDER, OPENAI_EMBEDDING_MODEL, LOCAL_EMBEDDING_DIMENSIONS
+from config import (
+    LLM_HTTP_MAX_CONNECTIONS, LLM_HTTP_MAX_KEEPALIVE, LLM_HTTP_KEEPALIVE_EXPIRY,
+    LLM_HTTP_TIMEOUT, LLM_HTTP_CONNECT_TIMEOUT, LLM_MAX_RETRIES,
+)
+import httpx
+import threading
 import os
 
 class LLMFactory:
+    EMBEDDING_PROVIDERS = ("openai", "local")
+
+    _embeddings = {}
+    _embeddings_lock = threading.Lock()
+
+    # Chat clients keyed by their model configuration, all sharing one pair of
+    # keep-alive HTTP connection pools
+    _chat_clients = {}
+    _clients_lock = threading.Lock()
+    _http_client = None
+    _http_async_client = None
+
+    @classmethod
+    def _http_settings(cls):
+        return {
+            "limits": httpx.Limits(
+                max_connections=LLM_HTTP_MAX_CONNECTIONS,
+                max_keepalive_connections=LLM_HTTP_MAX_KEEPALIVE,
+                keepalive_expiry=LLM_HTTP_KEEPALIVE_EXPIRY,
+            ),
+            "timeout": httpx.Timeout(LLM_HTTP_TIMEOUT, connect=LLM_HTTP_CONNECT_TIMEOUT),
+        }
+
+    @classmethod
+    def http_clients(cls):
+        """Process-wide sync and async httpx clients used by every OpenAI client"""
+        if cls._http_client is None or cls._http_async_client is None:
+            with cls._clients_lock:
+                if cls._http_client is None:
+                    cls._http_client = httpx.Client(**cls._http_settings())
+                if cls._http_async_client is None:
+                    cls._http_async_client = httpx.AsyncClient(**cls._http_settings())
+        return cls._http_client, cls._http_async_client
+
+    @classmethod
+    def chat_client(cls, model="gpt-4o-mini", temperature=0, max_tokens=1024, **kwargs):
+        """
+        Return the shared ChatOpenAI for this configuration, creating it once
+        
+        Args:
+            model: OpenAI chat model name
+            temperature: Sampling temperature
+            max_tokens: Completion token limit
+            **kwargs: Extra ChatOpenAI arguments; they are part of the cache key
+            
+        Returns:
+            ChatOpenAI: Client reusing the pooled keep-alive connections
+        """
+        key = (model, temperature, max_tokens, tuple(sorted((name, repr(value)) for name, value in kwargs.items())))
+        client = cls._chat_clients.get(key)
+        if client is None:
+            http_client, http_async_client = cls.http_clients()
+            with cls._clients_lock:
+                client = cls._chat_clients.get(key)
+                if client is None:
+                    client = ChatOpenAI(
+                        model=model,
+                        temperature=temperature,
+                        max_tokens=max_tokens,
+                        openai_api_key=os.getenv("OPENAI_API_KEY"),
+                        max_retries=LLM_MAX_RETRIES,
+                        http_client=http_client,
+                        http_async_client=http_async_client,
+                        **kwargs
+                    )
+                    cls._chat_clients[key] = client
+        return client
+
     @classmethod
     def open_ai(cls):
-        return ChatOpenAI(
-            model="gpt-4o-mini",
-            temperature=0,
-            max_tokens=1024,
-            openai_api_key=os.getenv("OPENAI_API_KEY")
-        )
+        return cls.chat_client(model="gpt-4o-mini", temperature=0, max_tokens=1024)
 
     @classmethod
     def open_ai_structured_llm(cls, structured_output=None):
-        return ChatOpenAI(
+        return cls.chat_client(
             model="gpt-4o-mini",
             temperature=0,
             max_tokens=1024,
-            openai_api_key=os.getenv("OPENAI_API_KEY"),
             structured_output=structured_output
         )
 
     @classmethod
-    def open_ai_embeddings(cls):
-        return OpenAIEmbeddings(
-            model="text-embedding-3-large",
-            openai_api_key=os.getenv("OPENAI_API_KEY")
-        )
+    def client_stats(cls):
+        return {
+            "chat_clients": len(cls._chat_clients),
+            "http_pool_ready": cls._http_client is not None,
+            "max_connections": LLM_HTTP_MAX_CONNECTIONS,
+            "max_keepalive_connections": LLM_HTTP_MAX_KEEPALIVE,
+            "keepalive_expiry": LLM_HTTP_KEEPALIVE_EXPIRY,
+            "timeout": LLM_HTTP_TIMEOUT,
+        }
+
+    @classmethod
+    async def aclose(cls):
+        """Close the pooled connections when the worker stops"""
+        with cls._clients_lock:
+            http_client, http_async_client = cls._http_client, cls._http_async_client
+            cls._http_client = None
+            cls._http_async_client = None
+            cls._chat_clients = {}
+            cls._embeddings.pop("openai", None)
+        if http_client is not None:
+            http_client.close()
+        if http_async_client is not None:
+            await http_async_client.aclose()
+
+    @classmethod
+    def embeddings(cls, provider=None):
+        """
+        Shared embeddings client for the configured provider
         
-        
\ No newline at end of file
+        Args:
+            provider: "openai" (cached text-embedding-3-large) or "local" (offline
+                hashed n-gram vectors); defaults to EMBEDDING_PROVIDER
+        """
+        provider = (provider or EMBEDDING_PROVIDER).lower()
+        if provider not in cls.EMBEDDING_PROVIDERS:
+            raise ValueError(f"Unknown embedding provider: {provider}")
+
+        if provider not in cls._embeddings:
+            with cls._embeddings_lock:
+                if provider not in cls._embeddings:
+                    if provider == "local":
+                        cls._embeddings[provider] = HashingEmbeddings(dimensions=LOCAL_EMBEDDING_DIMENSIONS)
+                    else:
+                        http_client, http_async_client = cls.http_clients()
+                        cls._embeddings[provider] = CachedEmbeddings(
+                            OpenAIEmbeddings(
+                                model=OPENAI_EMBEDDING_MODEL,
+                                openai_api_key=os.getenv("OPENAI_API_KEY"),
+                                max_retries=LLM_MAX_RETRIES,
+                                http_client=http_client,
+                                http_async_client=http_async_client
+                            ),
+                            model_name=OPENAI_EMBEDDING_MODEL,
+                            max_size=EMBEDDING_CACHE_SIZE,
+                            disk_path=EMBEDDING_CACHE_PATH or None,
+                        )
+        return cls._embeddings[provider]
+
+    @classmethod
+    def open_ai_embeddings(cls):
+        """Shared OpenAI embeddings client; repeated texts are served from CachedEmbeddings"""
+        return cls.embeddings("openai")
+
+    @classmethod
+    def embedding_cache_stats(cls):
+        embeddings = cls._embeddings.get("openai")
+        return embeddings.stats() if embeddings is not None else {}
@@ -0,0 +1,173 @@
+import hashlib
+import os
+import sqlite3
+import threading
+from array import array
+from typing import Dict, List, Optional
+
+from langchain_core.embeddings import Embeddings
+
+from utils.lru_cache import LRUTTLCache
+
+
+class EmbeddingDiskStore:
+    """SQLite table of embeddings keyed by (model name, sha256 of the exact text)"""
+
+    def __init__(self, path: str):
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self.path = path
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "create table if not exists embeddings ("
+            "model text not null, text_hash text not null, vector blob not null, "
+            "primary key (model, text_hash))"
+        )
+        self._conn.commit()
+
+    def get_many(self, model: str, hashes: List[str]) -> Dict[str, List[float]]:
+        found = {}
+        with self._lock:
+            # Stay well below SQLite's bound-parameter limit
+            for start in range(0, len(hashes), 500):
+                chunk = hashes[start:start + 500]
+                placeholders = ",".join("?" * len(chunk))
+                rows = self._conn.execute(
+                    f"select text_hash, vector from embeddings where model = ? and text_hash in ({placeholders})",
+                    [model, *chunk],
+                ).fetchall()
+                for text_hash, blob in rows:
+                    found[text_hash] = array("d", blob).tolist()
+        return found
+
+    def put_many(self, model: str, items: Dict[str, List[float]]) -> None:
+        with self._lock:
+            self._conn.executemany(
+                "insert or replace into embeddings (model, text_hash, vector) values (?, ?, ?)",
+                [(model, text_hash, array("d", vector).tobytes()) for text_hash, vector in items.items()],
+            )
+            self._conn.commit()
+
+
+class CachedEmbeddings(Embeddings):
+    """
+    Embeddings wrapper that remembers vectors by model name and exact text.
+
+    Query embeddings (embed_query, embed_queries) go to an in-process LRU
+    first, then to the optional on-disk store, and only the remaining texts are
+    sent to the wrapped provider in one batch. The LRU keeps packed float32
+    arrays (about 12KB per 3072-dim vector instead of ~100KB as a list) and
+    converts them back to lists on return.
+
+    Bulk embed_documents calls from index builds skip the LRU so a rebuild
+    cannot flush it or grow it to the whole corpus; the on-disk store serves
+    repeated builds.
+    """
+
+    def __init__(self, embeddings: Embeddings, model_name: str, max_size: int = 4096, disk_path: Optional[str] = None):
+        self.embeddings = embeddings
+        self.model_name = model_name
+        self.memory = LRUTTLCache(max_size=max_size)
+        self.disk = EmbeddingDiskStore(disk_path) if disk_path else None
+        self._lock = threading.Lock()
+        self._stats = {"memory_hits": 0, "disk_hits": 0, "misses": 0, "provider_calls": 0}
+
+    @staticmethod
+    def _hash(text: str) -> str:
+        return hashlib.sha256(text.encode("utf-8")).hexdigest()
+
+    def _count(self, **increments: int) -> None:
+        with self._lock:
+            for key, value in increments.items():
+                self._stats[key] += value
+
+    def _remember(self, text_hash: str, vector: List[float]) -> None:
+        self.memory.set((self.model_name, text_hash), array("f", vector))
+
+    def _lookup(self, texts: List[str], use_memory: bool = True) -> Dict[str, List[float]]:
+        """Return cached vectors for the given texts, keyed by text hash"""
+        hashes = list(dict.fromkeys(self._hash(text) for text in texts))
+        found = {}
+        if use_memory:
+            for text_hash in hashes:
+                vector = self.memory.get((self.model_name, text_hash))
+                if vector is not None:
+                    found[text_hash] = vector.tolist()
+        memory_hits = len(found)
+
+        missing = [text_hash for text_hash in hashes if text_hash not in found]
+        if missing and self.disk is not None:
+            from_disk = self.disk.get_many(self.model_name, missing)
+            if use_memory:
+                for text_hash, vector in from_disk.items():
+                    self._remember(text_hash, vector)
+            found.update(from_disk)
+
+        self._count(memory_hits=memory_hits, disk_hits=len(found) - memory_hits)
+        return found
+
+    def _missing_texts(self, texts: List[str], found: Dict[str, List[float]]) -> List[str]:
+        return list(dict.fromkeys(text for text in texts if self._hash(text) not in found))
+
+    def _store(self, texts: List[str], vectors: List[List[float]], found: Dict[str, List[float]], use_memory: bool = True) -> None:
+        new_items = {}
+        for text, vector in zip(texts, vectors):
+            text_hash = self._hash(text)
+            vector = list(vector)
+            found[text_hash] = vector
+            new_items[text_hash] = vector
+            if use_memory:
+                self._remember(text_hash, vector)
+        if self.disk is not None and new_items:
+            self.disk.put_many(self.model_name, new_items)
+        self._count(misses=len(new_items), provider_calls=1)
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        """Bulk embedding for index builds; served from the disk store only"""
+        found = self._lookup(texts, use_memory=False)
+        missing = self._missing_texts(texts, found)
+        if missing:
+            self._store(missing, self.embeddings.embed_documents(missing), found, use_memory=False)
+        return [found[self._hash(text)] for text in texts]
+
+    def embed_queries(self, texts: List[str]) -> List[List[float]]:
+        """Embed a batch of query texts in one provider call, through the memory tier"""
+        found = self._lookup(texts)
+        missing = self._missing_texts(texts, found)
+        if missing:
+            self._store(missing, self.embeddings.embed_documents(missing), found)
+        return [found[self._hash(text)] for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        found = self._lookup([text])
+        if not found:
+            self._store([text], [self.embeddings.embed_query(text)], found)
+        return found[self._hash(text)]
+
+    async def aembed_documents(self, texts: List[str]) -> List[List[float]]:
+        found = self._lookup(texts, use_memory=False)
+        missing = self._missing_texts(texts, found)
+        if missing:
+            self._store(missing, await self.embeddings.aembed_documents(missing), found, use_memory=False)
+        return [found[self._hash(text)] for text in texts]
+
+    async def aembed_queries(self, texts: List[str]) -> List[List[float]]:
+        found = self._lookup(texts)
+        missing = self._missing_texts(texts, found)
+        if missing:
+            self._store(missing, await self.embeddings.aembed_documents(missing), found)
+        return [found[self._hash(text)] for text in texts]
+
+    async def aembed_query(self, text: str) -> List[float]:
+        found = self._lookup([text])
+        if not found:
+            self._store([text], [await self.embeddings.aembed_query(text)], found)
+        return found[self._hash(text)]
+
+    def stats(self) -> Dict[str, object]:
+        with self._lock:
+            stats = dict(self._stats)
+        stats["model"] = self.model_name
+        stats["memory"] = self.memory.stats()
+        stats["disk_path"] = self.disk.path if self.disk else None
+        return stats
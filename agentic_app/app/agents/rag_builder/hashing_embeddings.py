@@ -0,0 +1,58 @@
+import re
+import zlib
+from typing import List
+
+import numpy as np
+from langchain_core.embeddings import Embeddings
+
+
+class HashingEmbeddings(Embeddings):
+    """
+    Offline embedder: word unigrams/bigrams and character n-grams hashed into a
+    fixed-size vector with NumPy.
+
+    Counts are log-scaled, each feature gets a hash-derived sign so collisions
+    tend to cancel out, and vectors are L2-normalized so Chroma's distance and
+    relevance functions behave the same way they do for OpenAI embeddings.
+    The embedder is stateless, so documents and queries embed identically
+    without fitting anything on the corpus.
+    """
+
+    def __init__(self, dimensions: int = 1024, char_ngrams: tuple = (3, 5)):
+        self.dimensions = dimensions
+        self.char_ngrams = char_ngrams
+        self.model_name = f"local-hashing-{dimensions}"
+
+    def _features(self, text: str) -> List[str]:
+        words = re.findall(r"\w+", (text or "").casefold())
+        features = [f"w:{word}" for word in words]
+        features.extend(f"b:{a} {b}" for a, b in zip(words, words[1:]))
+        low, high = self.char_ngrams
+        for word in words:
+            padded = f"<{word}>"
+            for size in range(low, high + 1):
+                features.extend(f"c:{padded[i:i + size]}" for i in range(len(padded) - size + 1))
+        return features
+
+    def _embed(self, text: str) -> List[float]:
+        vector = np.zeros(self.dimensions, dtype=np.float32)
+        features = self._features(text)
+        if not features:
+            return vector.tolist()
+
+        hashes = np.fromiter((zlib.crc32(feature.encode("utf-8")) for feature in features), dtype=np.uint32, count=len(features))
+        buckets = hashes % self.dimensions
+        signs = np.where((hashes >> 31) & 1, -1.0, 1.0).astype(np.float32)
+        np.add.at(vector, buckets, signs)
+
+        vector = np.sign(vector) * np.log1p(np.abs(vector))
+        norm = np.linalg.norm(vector)
+        if norm > 0:
+            vector /= norm
+        return vector.tolist()
+
+    def embed_documents(self, texts: List[str]) -> List[List[float]]:
+        return [self._embed(text) for text in texts]
+
+    def embed_query(self, text: str) -> List[float]:
+        return self._embed(text)
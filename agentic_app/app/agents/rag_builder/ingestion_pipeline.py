@@ -0,0 +1,160 @@
+import random
+import threading
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional
+
+from config import RAG_INGEST_BATCH_SIZE, RAG_INGEST_CONCURRENCY, RAG_INGEST_MAX_RETRIES
+
+
+class IngestionPipeline:
+    """
+    Embeds documents in fixed-size batches on a bounded thread pool and writes
+    each finished batch to Chroma.
+
+    Embedding calls that hit a rate limit or a transient connection error are
+    retried with exponential backoff (honouring Retry-After when the API sends
+    it). Writes happen on the calling thread as batches complete, and every
+    written batch is reported through on_batch_done so the caller can checkpoint.
+    A batch that still fails after its retries is skipped and left for the next run.
+
+    Documents may be a stream: at most two batches per worker are in flight, so
+    one run (one thread pool, one progress count) covers a whole sync in bounded
+    memory.
+    """
+
+    def __init__(self, embeddings, batch_size: int = None, concurrency: int = None, max_retries: int = None):
+        self.embeddings = embeddings
+        self.batch_size = max(1, batch_size or RAG_INGEST_BATCH_SIZE)
+        self.concurrency = max(1, concurrency or RAG_INGEST_CONCURRENCY)
+        self.max_retries = RAG_INGEST_MAX_RETRIES if max_retries is None else max_retries
+        self.retries = 0
+        # _embed_batch runs on the pool threads, so retry counting is serialized
+        self._retry_lock = threading.Lock()
+
+    @staticmethod
+    def is_retryable(error: Exception) -> bool:
+        """Rate limits (HTTP 429) and connection/timeouts are worth another attempt"""
+        status_code = getattr(error, "status_code", None) or getattr(getattr(error, "response", None), "status_code", None)
+        if status_code == 429 or (status_code is not None and status_code >= 500):
+            return True
+        name = type(error).__name__
+        if name in ("RateLimitError", "APIConnectionError", "APITimeoutError", "Timeout", "ConnectError", "ReadTimeout"):
+            return True
+        return "rate limit" in str(error).lower()
+
+    @staticmethod
+    def retry_delay(error: Exception, attempt: int) -> float:
+        response = getattr(error, "response", None)
+        retry_after = getattr(response, "headers", {}).get("retry-after") if response is not None else None
+        try:
+            if retry_after is not None:
+                return float(retry_after)
+        except ValueError:
+            pass
+        return min(60.0, 2 ** attempt) + random.uniform(0, 1)
+
+    def _embed_batch(self, batch: List[Any]) -> List[List[float]]:
+        texts = [doc.page_content for doc in batch]
+        attempt = 0
+        while True:
+            try:
+                return self.embeddings.embed_documents(texts)
+            except Exception as e:
+                if attempt >= self.max_retries or not self.is_retryable(e):
+                    raise
+                delay = self.retry_delay(e, attempt)
+                attempt += 1
+                with self._retry_lock:
+                    self.retries += 1
+                print(f"Embedding batch failed ({type(e).__name__}), retry {attempt}/{self.max_retries} in {delay:.1f}s")
+                time.sleep(delay)
+
+    @staticmethod
+    def _write_batch(vector_store, batch: List[Any], vectors: List[List[float]]) -> None:
+        vector_store._collection.upsert(
+            ids=[doc.id for doc in batch],
+            embeddings=vectors,
+            documents=[doc.page_content for doc in batch],
+            metadatas=[doc.metadata or None for doc in batch],
+        )
+
+    def _batches(self, documents: Iterable[Any]) -> Iterator[List[Any]]:
+        batch = []
+        for doc in documents:
+            batch.append(doc)
+            if len(batch) >= self.batch_size:
+                yield batch
+                batch = []
+        if batch:
+            yield batch
+
+    def run(self, vector_store, documents: Iterable[Any], on_batch_done: Optional[Callable[[List[str]], None]] = None,
+            total: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Embed and upsert documents that already carry ids
+
+        Args:
+            vector_store: Chroma instance to write into
+            documents: Documents with doc.id set, as a list or a stream
+            on_batch_done: Called with the ids of every batch written to Chroma
+            total: Number of documents to ingest, for progress and ETA. Taken from
+                len(documents) when omitted; reported as unknown for streams
+
+        Returns:
+            Dict[str, Any]: Ingested/failed counts, throughput and retry totals
+        """
+        if total is None and hasattr(documents, "__len__"):
+            total = len(documents)
+        progress = {"ingested": 0, "failed": 0, "batches": 0}
+        max_in_flight = self.concurrency * 2
+        started_at = time.perf_counter()
+
+        def complete(done, in_flight):
+            for future in done:
+                batch = in_flight.pop(future)
+                try:
+                    self._write_batch(vector_store, batch, future.result())
+                except Exception as e:
+                    progress["failed"] += len(batch)
+                    print(f"Skipping batch of {len(batch)} documents: {e}")
+                    continue
+
+                progress["ingested"] += len(batch)
+                if on_batch_done is not None:
+                    on_batch_done([doc.id for doc in batch])
+                self._report_progress(progress, total, started_at)
+
+        with ThreadPoolExecutor(max_workers=self.concurrency) as pool:
+            in_flight = {}
+            for batch in self._batches(documents):
+                in_flight[pool.submit(self._embed_batch, batch)] = batch
+                progress["batches"] += 1
+                if len(in_flight) >= max_in_flight:
+                    done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                    complete(done, in_flight)
+            while in_flight:
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                complete(done, in_flight)
+
+        elapsed = time.perf_counter() - started_at
+        return {
+            "ingested": progress["ingested"],
+            "failed": progress["failed"],
+            "batches": progress["batches"],
+            "retries": self.retries,
+            "elapsed_seconds": round(elapsed, 3),
+            "docs_per_sec": round(progress["ingested"] / elapsed, 2) if elapsed > 0 else 0.0,
+        }
+
+    @staticmethod
+    def _report_progress(progress: Dict[str, int], total: Optional[int], started_at: float) -> None:
+        ingested = progress["ingested"]
+        elapsed = time.perf_counter() - started_at
+        rate = ingested / elapsed if elapsed > 0 else 0.0
+        if total is None:
+            print(f"Ingested {ingested} documents ({rate:.1f} docs/sec, total unknown)")
+            return
+        remaining = max(0, total - ingested - progress["failed"])
+        eta = remaining / rate if rate > 0 else 0.0
+        print(f"Ingested {ingested}/{total} documents ({rate:.1f} docs/sec, ETA {eta:.0f}s)")
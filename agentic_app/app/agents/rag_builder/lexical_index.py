@@ -0,0 +1,213 @@
+import json
+import math
+import os
+import re
+from collections import Counter, defaultdict
+from typing import Any, Dict, Iterable, List, Optional
+
+from enum_helper.object_synonyms import build_object_vocabulary
+
+
+class LexicalIndex:
+    """
+    BM25 index over the RAG pattern text and the field labels / API names in
+    each document's data_fields, persisted next to the Chroma collection.
+
+    Besides ranked search it answers "exact label" queries: a query that names a
+    field API name (Cas_ex1_36), or whose words are exactly one field label once
+    the object name and request words ("show my", "list") are removed.
+    """
+
+    INDEX_FILE = "lexical_index.json"
+    K1 = 1.5
+    B = 0.75
+
+    # Request words stripped before comparing a query with field labels
+    REQUEST_WORDS = {
+        "show", "me", "my", "all", "the", "a", "an", "list", "get", "fetch", "display",
+        "view", "give", "of", "for", "in", "with", "and", "please", "field", "fields",
+    }
+    FILTER_FIELDS = ("object_name", "intent", "output_format", "role_id")
+
+    _object_words = set(build_object_vocabulary())
+
+    def __init__(self):
+        self.doc_ids: List[str] = []
+        self.doc_meta: List[Dict[str, Any]] = []
+        self.doc_lengths: List[int] = []
+        self.postings: Dict[str, Dict[int, int]] = defaultdict(dict)
+        self.labels: Dict[str, List[int]] = defaultdict(list)
+        self.api_names: Dict[str, List[int]] = defaultdict(list)
+        self._entries: List[Dict[str, Any]] = []
+
+    @staticmethod
+    def tokenize(text: str) -> List[str]:
+        return re.findall(r"[\w]+", (text or "").casefold())
+
+    @classmethod
+    def normalize_label(cls, text: str) -> str:
+        return " ".join(cls.tokenize(text))
+
+    @staticmethod
+    def field_entries(metadata: Dict[str, Any], key: str = "data_fields") -> List[Dict[str, Any]]:
+        """Recover a list of field dicts (data_fields, filters, groupBy) from cleaned metadata"""
+        value = metadata.get(key)
+        if isinstance(value, str) and value.startswith("["):
+            try:
+                return [entry for entry in json.loads(value) if isinstance(entry, dict)]
+            except ValueError:
+                return []
+        prefix = f"{key}_"
+        flattened = {name[len(prefix):]: item for name, item in metadata.items() if name.startswith(prefix)}
+        return [flattened] if flattened else []
+
+    def add(self, doc_id: str, text: str, metadata: Dict[str, Any]) -> None:
+        fields = self.field_entries(metadata)
+        labels = sorted({self.normalize_label(str(field.get("name", ""))) for field in fields} - {""})
+        api_names = sorted({str(field.get("FieldName", "")).casefold() for field in fields} - {""})
+
+        meta = {field: metadata.get(field) for field in self.FILTER_FIELDS if field in metadata}
+        # Chroma's $ne matches missing keys, so only record data_fields when it is present
+        if "data_fields" in metadata:
+            meta["data_fields"] = "" if metadata["data_fields"] == "" else "1"
+        elif fields:
+            meta["data_fields"] = "1"
+
+        tokens = self.tokenize(text) + [token for label in labels for token in label.split()] + api_names
+        self._add_entry({"id": doc_id, "tokens": tokens, "meta": meta, "labels": labels, "api_names": api_names})
+
+    def _add_entry(self, entry: Dict[str, Any]) -> None:
+        index = len(self.doc_ids)
+        self.doc_ids.append(entry["id"])
+        self.doc_meta.append(entry["meta"])
+        self.doc_lengths.append(len(entry["tokens"]))
+        for token, count in Counter(entry["tokens"]).items():
+            self.postings[token][index] = count
+        for label in entry["labels"]:
+            self.labels[label].append(index)
+        for api_name in entry["api_names"]:
+            self.api_names[api_name].append(index)
+        self._entries.append(entry)
+
+    def __len__(self) -> int:
+        return len(self.doc_ids)
+
+    @staticmethod
+    def matches(meta: Dict[str, Any], where: Optional[Dict[str, Any]]) -> bool:
+        """Evaluate the subset of Chroma where syntax built by RagRetriever.build_where"""
+        if not where:
+            return True
+        if "$and" in where:
+            return all(LexicalIndex.matches(meta, clause) for clause in where["$and"])
+        for field, condition in where.items():
+            value = meta.get(field)
+            if isinstance(condition, dict):
+                if "$in" in condition and value not in condition["$in"]:
+                    return False
+                if "$ne" in condition and value == condition["$ne"]:
+                    return False
+            elif value != condition:
+                return False
+        return True
+
+    def _rank(self, candidates: Iterable[int], query_tokens: List[str], where: Optional[Dict[str, Any]], k: int) -> List[str]:
+        if not self.doc_ids:
+            return []
+        avg_length = sum(self.doc_lengths) / len(self.doc_lengths)
+        total = len(self.doc_ids)
+        scores: Dict[int, float] = defaultdict(float)
+        allowed = set(candidates) if candidates is not None else None
+
+        for token in set(query_tokens):
+            postings = self.postings.get(token)
+            if not postings:
+                continue
+            idf = math.log(1 + (total - len(postings) + 0.5) / (len(postings) + 0.5))
+            for index, tf in postings.items():
+                if allowed is not None and index not in allowed:
+                    continue
+                norm = tf + self.K1 * (1 - self.B + self.B * self.doc_lengths[index] / avg_length)
+                scores[index] += idf * tf * (self.K1 + 1) / norm
+
+        if allowed is not None:
+            for index in allowed:
+                scores.setdefault(index, 0.0)
+
+        ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))
+        return [self.doc_ids[index] for index, _ in ranked if self.matches(self.doc_meta[index], where)][:k]
+
+    def search(self, query: str, where: Optional[Dict[str, Any]] = None, k: int = 10) -> List[str]:
+        """Return up to k document ids ranked by BM25"""
+        return self._rank(None, self.tokenize(query), where, k)
+
+    def exact_match(self, query: str, where: Optional[Dict[str, Any]] = None, k: int = 2) -> List[str]:
+        """
+        Return ids for a query that names a field exactly, or [] when it does not
+
+        Args:
+            query: Subquery text
+            where: Chroma-style where clause the hits must satisfy
+            k: Maximum number of ids
+
+        Returns:
+            List[str]: Document ids ranked by BM25 among the exact matches
+        """
+        tokens = self.tokenize(query)
+        candidates = set()
+        for token in tokens:
+            candidates.update(self.api_names.get(token, ()))
+
+        if not candidates:
+            for label in self._label_candidates(tokens):
+                if label in self.labels:
+                    candidates.update(self.labels[label])
+                    break
+
+        if not candidates:
+            return []
+        return self._rank(candidates, tokens, where, k)
+
+    def _label_candidates(self, tokens: List[str]) -> List[str]:
+        """
+        Label spellings to try for a query, longest first: request words are
+        dropped, then object words may be trimmed from either end only, so
+        "case customer city" can match the label "customer city" but never "city"
+        """
+        words = [token for token in tokens if token not in self.REQUEST_WORDS]
+        start_limit = 0
+        while start_limit < len(words) and words[start_limit] in self._object_words:
+            start_limit += 1
+        end_limit = len(words)
+        while end_limit > 0 and words[end_limit - 1] in self._object_words:
+            end_limit -= 1
+
+        spans = [
+            (start, end)
+            for start in range(0, start_limit + 1)
+            for end in range(len(words), end_limit - 1, -1)
+            if start < end and not all(word in self._object_words for word in words[start:end])
+        ]
+        spans.sort(key=lambda span: -(span[1] - span[0]))
+        return [" ".join(words[start:end]) for start, end in spans]
+
+    def save(self, persist_directory: str) -> None:
+        os.makedirs(persist_directory, exist_ok=True)
+        index_path = os.path.join(persist_directory, self.INDEX_FILE)
+        with open(index_path + ".tmp", "w", encoding="utf-8") as file:
+            json.dump({"documents": self._entries}, file)
+        os.replace(index_path + ".tmp", index_path)
+
+    @classmethod
+    def load(cls, persist_directory: str) -> Optional["LexicalIndex"]:
+        """Load the persisted index, or None when the store was built without one"""
+        try:
+            with open(os.path.join(persist_directory, cls.INDEX_FILE), "r", encoding="utf-8") as file:
+                payload = json.load(file)
+        except (OSError, ValueError):
+            return None
+
+        index = cls()
+        for entry in payload.get("documents", []):
+            index._add_entry(entry)
+        print(f"Loaded lexical index with {len(index)} documents")
+        return index
@@ -8,31 +8,33 @@ from langchain_openai import OpenAIEmbeddings  # or HuggingFaceEmbeddings
 
 
 class RagBuilder:
-    def __init__(self):
+    def __init__(self, vector_store: VectorStore = None):
         self.rag_files_loader = RagFileLoader()
-        self.vector_store = VectorStore()
+        self.vector_store = vector_store or VectorStore()
 
     def load_all_rag_files(self):
         return self.rag_files_loader.load_all_rag_files()
 
-    def get_vector_documents(self):
-        documents_list = self.load_all_rag_files()
-
-        vector_documents = []
+    def iter_vector_documents(self):
+        """
+        Yield one Document per RAG record, streaming file by file from rag_output_files
+        
+        Returns:
+            Iterator[Document]: Documents with cleaned metadata and content-hash ids
+        """
+        for item in self.rag_files_loader.iter_rag_records():
+            query_text = item.get("query", "")
+            meta_data = item.get("meta_data", {})
 
-        if documents_list:
-            for item in documents_list:
-                query_text = item.get("query", "")
-                meta_data = item.get("meta_data", {})
+            # Clean metadata to ensure all values are scalars
+            clean_metadata = self._clean_metadata(meta_data)
 
-                # Clean metadata to ensure all values are scalars
-                clean_metadata = self._clean_metadata(meta_data)
-                
-                # Create document with clean metadata
-                doc = Document(page_content=str(query_text), metadata=clean_metadata)
-                vector_documents.append(doc)
+            # Create document with clean metadata and a content-hash id
+            doc_id = VectorStore.content_id(str(query_text), clean_metadata)
+            yield Document(id=doc_id, page_content=str(query_text), metadata=clean_metadata)
 
-        return vector_documents
+    def get_vector_documents(self):
+        return list(self.iter_vector_documents())
     
     def _clean_metadata(self, metadata):
         """
@@ -72,7 +74,13 @@ class RagBuilder:
         return clean_meta
 
     def build_documents(self):
-        v_documents = self.get_vector_documents()
-        db_status = self.vector_store.get_vector_store(v_documents)
+        sync_status = self.vector_store.sync_documents(self.iter_vector_documents())
 
-        return {"status": f"✅ Loaded {len(v_documents)} documents into Chroma"}
+        return {
+            "status": f"✅ Synced {sync_status['total']} documents into Chroma",
+            "added": sync_status["added"],
+            "failed": sync_status["failed"],
+            "deleted": sync_status["deleted"],
+            "unchanged": sync_status["unchanged"],
+            "docs_per_sec": sync_status["docs_per_sec"],
+        }
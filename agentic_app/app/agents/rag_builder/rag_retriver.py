@@ -1,7 +1,17 @@
+import asyncio
+import json
+import threading
+
 from langchain_core.documents import Document
-from typing_extensions import List, TypedDict
+from typing_extensions import Any, Dict, List, Optional, TypedDict
 
+from config import RAG_MIN_RELEVANCE_SCORE, RAG_INFER_OBJECT_FILTER, RAG_HYBRID_SEARCH, RAG_HYBRID_CANDIDATES
 from agents.rag_builder.vector_store import VectorStore
+from agents.rag_builder.lexical_index import LexicalIndex
+from agents.builder.greeting_classifier import GreetingClassifier
+from utils.metrics import Metrics
+
+RETRIEVAL_DURATION = "rag_retrieval_duration_seconds"
 
 
 class State(TypedDict):
@@ -10,42 +20,336 @@ class State(TypedDict):
 
 
 class RagRetriever:
-    def __init__(self):
+    # Metadata written by RagBuilder._clean_metadata that callers may filter on
+    FILTER_FIELDS = ("object_name", "intent", "output_format", "role_id")
+    # Reciprocal-rank fusion constant
+    RRF_K = 60
+
+    _lock = threading.Lock()
+    _stats = {"exact_lexical": 0, "hybrid": 0, "vector_only": 0, "embedding_batches": 0}
+
+    def __init__(self, provider: Optional[str] = None, persist_directory: Optional[str] = None):
+        store = VectorStore(provider)
+        persist_directory = persist_directory or store.store_directory
         self.vector_store = (
-            VectorStore().load_existing_vector_store()
+            store.load_existing_vector_store(persist_directory)
         )  # Initialize with empty list
+        self.persist_directory = persist_directory
+        self._lexical_lock = threading.Lock()
+        self._index_version = VectorStore.get_index_version(persist_directory)
+        self.lexical_index = LexicalIndex.load(persist_directory) if RAG_HYBRID_SEARCH else None
 
-    def invoke(self, question: str) -> State:
+    def _refresh_lexical_index(self) -> None:
+        """Reload lexical_index.json when the index version stamp changed, e.g. after a rebuild in another worker"""
+        if not RAG_HYBRID_SEARCH:
+            return
+        version = VectorStore.get_index_version(self.persist_directory)
+        if version == self._index_version:
+            return
+        with self._lexical_lock:
+            if version != self._index_version:
+                self.lexical_index = LexicalIndex.load(self.persist_directory)
+                self._index_version = version
 
-        retrieved_docs = self.vector_store.similarity_search(question, k=3)
+    @Metrics.timed(RETRIEVAL_DURATION, method="invoke")
+    def invoke(self, question: str, filters: Optional[Dict[str, Any]] = None) -> State:
 
-        return {"user__orignal_query": question, "context": retrieved_docs}
+        retrieved_docs = self.vector_store.similarity_search(question, k=3, filter=self.build_where(question, filters))
+        if not retrieved_docs and self._inferred(question, filters):
+            retrieved_docs = self.vector_store.similarity_search(question, k=3, filter=self.build_where(question, filters, infer=False))
 
-    def invoke_list(self, decomposed_queries: list[str]) -> List[Document]:
+        return {"user__orignal_query": question, "context": retrieved_docs}
 
+    @Metrics.timed(RETRIEVAL_DURATION, method="invoke_list")
+    def invoke_list(self, decomposed_queries: list[str], filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """
+        Retrieve contexts for every decomposed query with one embedding call
+        
+        Args:
+            decomposed_queries: Subqueries produced by QueryDecomposition
+            filters: Optional values for object_name, intent, output_format or role_id;
+                a list matches any of its values
+                
+        Returns:
+            List of {"query", "contexts"} entries for queries with usable contexts
+        """
         try:
             if not decomposed_queries:
                 return []
 
+            self._refresh_lexical_index()
+            exact = self._exact_matches(decomposed_queries, filters, k=2)
+            pending = [query for index, query in enumerate(decomposed_queries) if index not in exact]
+            query_embeddings = self._embed(pending)
+            documents = self._merge(decomposed_queries, exact, self._search(pending, query_embeddings, filters, k=2))
+
             rag_contexts = []
-            for query in decomposed_queries:
-                contexts = self.vector_store.similarity_search(query, k=2)
-                
-                if contexts:
-                    # Filter contexts to only include documents with valid data_fields
-                    filtered_contexts = []
-                    for doc in contexts:
-                        if "data_fields" in doc.metadata:
-                            data_field = doc.metadata["data_fields"]
-                            # Check if data_field is valid (not None, not empty list, not empty string)
-                            if data_field is not None and data_field != "" and not (isinstance(data_field, list) and len(data_field) == 0):
-                                filtered_contexts.append(doc)
-                    
-                    # Only append if we have valid contexts with data_fields
-                    if filtered_contexts:
-                        rag_contexts.append({"query": query, "contexts": filtered_contexts})
+            for query, contexts in zip(decomposed_queries, documents):
+                self._append_contexts(rag_contexts, query, contexts)
             
             return rag_contexts
         
         except Exception as e:
             return []
+
+    @Metrics.timed(RETRIEVAL_DURATION, method="ainvoke")
+    async def ainvoke(self, question: str, filters: Optional[Dict[str, Any]] = None) -> State:
+        retrieved_docs = await self.vector_store.asimilarity_search(question, k=3, filter=self.build_where(question, filters))
+        if not retrieved_docs and self._inferred(question, filters):
+            retrieved_docs = await self.vector_store.asimilarity_search(question, k=3, filter=self.build_where(question, filters, infer=False))
+
+        return {"user__orignal_query": question, "context": retrieved_docs}
+
+    @Metrics.timed(RETRIEVAL_DURATION, method="ainvoke_list")
+    async def ainvoke_list(self, decomposed_queries: list[str], filters: Optional[Dict[str, Any]] = None) -> List[Document]:
+        """Async version of invoke_list; the Chroma queries run in a worker thread"""
+        try:
+            if not decomposed_queries:
+                return []
+
+            await asyncio.to_thread(self._refresh_lexical_index)
+            exact = await asyncio.to_thread(self._exact_matches, decomposed_queries, filters, 2)
+            pending = [query for index, query in enumerate(decomposed_queries) if index not in exact]
+            query_embeddings = await self._aembed(pending)
+            searched = await asyncio.to_thread(self._search, pending, query_embeddings, filters, 2)
+            documents = self._merge(decomposed_queries, exact, searched)
+
+            rag_contexts = []
+            for query, contexts in zip(decomposed_queries, documents):
+                self._append_contexts(rag_contexts, query, contexts)
+
+            return rag_contexts
+
+        except Exception as e:
+            return []
+
+    def build_where(self, query: str, filters: Optional[Dict[str, Any]] = None, infer: Optional[bool] = None) -> Dict[str, Any]:
+        """
+        Build the Chroma where clause for one query
+        
+        Documents without data_fields are always excluded. With inference on and
+        no object_name filter given, a query that names exactly one CRM object is
+        limited to that object plus the object-agnostic "Unknown" patterns.
+        
+        Args:
+            query: Query text, used to infer the object filter
+            filters: Explicit metadata filters
+            infer: Infer the object filter from the query, defaults to RAG_INFER_OBJECT_FILTER
+            
+        Returns:
+            Dict[str, Any]: Chroma where clause
+        """
+        filters = dict(filters or {})
+        if infer is None:
+            infer = RAG_INFER_OBJECT_FILTER
+        if filters.get("object_name") is None and infer:
+            objects = GreetingClassifier.find_objects(GreetingClassifier.tokenize(query))
+            if len(objects) == 1:
+                filters["object_name"] = [objects[0], "Unknown"]
+
+        clauses = [{"data_fields": {"$ne": ""}}]
+        for field in self.FILTER_FIELDS:
+            value = filters.get(field)
+            if value is None or value == "" or value == []:
+                continue
+            if isinstance(value, (list, tuple, set)):
+                clauses.append({field: {"$in": list(value)}})
+            else:
+                clauses.append({field: value})
+
+        return clauses[0] if len(clauses) == 1 else {"$and": clauses}
+
+    def _inferred(self, query: str, filters: Optional[Dict[str, Any]] = None) -> bool:
+        """
+        True when build_where narrowed the query with an inferred object filter
+
+        Object synonyms overlap ("customer" is a Contact, but Case has a
+        "Customer City" field), so an inferred filter that finds nothing is
+        retried with the caller's explicit filters only.
+        """
+        return self.build_where(query, filters) != self.build_where(query, filters, infer=False)
+
+    @Metrics.timed(RETRIEVAL_DURATION, method="embed")
+    def _embed(self, queries: List[str]) -> List[List[float]]:
+        if not queries:
+            return []
+        self._count("embedding_batches")
+        embeddings = self.vector_store.embeddings
+        # CachedEmbeddings keeps query vectors in its memory tier; other providers embed directly
+        embed = getattr(embeddings, "embed_queries", None) or embeddings.embed_documents
+        return embed(queries)
+
+    @Metrics.timed(RETRIEVAL_DURATION, method="aembed")
+    async def _aembed(self, queries: List[str]) -> List[List[float]]:
+        if not queries:
+            return []
+        self._count("embedding_batches")
+        embeddings = self.vector_store.embeddings
+        aembed = getattr(embeddings, "aembed_queries", None) or embeddings.aembed_documents
+        return await aembed(queries)
+
+    @staticmethod
+    def _merge(queries: List[str], exact: Dict[int, List[Document]], searched: List[List[Document]]) -> List[List[Document]]:
+        """Put exact-match and searched results back in subquery order"""
+        searched = iter(searched)
+        return [exact[index] if index in exact else next(searched) for index in range(len(queries))]
+
+    def _exact_matches(self, queries: List[str], filters: Optional[Dict[str, Any]], k: int = 2) -> Dict[int, List[Document]]:
+        """
+        Answer queries that name a field label or API name from the lexical index
+        
+        Returns:
+            Dict[int, List[Document]]: Documents keyed by query position; queries
+            without an exact match are left out and go through vector search
+        """
+        if self.lexical_index is None:
+            return {}
+
+        matched_ids = {}
+        for index, query in enumerate(queries):
+            ids = self.lexical_index.exact_match(query, where=self.build_where(query, filters), k=k)
+            if not ids and self._inferred(query, filters):
+                ids = self.lexical_index.exact_match(query, where=self.build_where(query, filters, infer=False), k=k)
+            if ids:
+                matched_ids[index] = ids
+        if not matched_ids:
+            return {}
+
+        docs_by_id = self._get_documents([doc_id for ids in matched_ids.values() for doc_id in ids])
+        exact = {}
+        for index, ids in matched_ids.items():
+            docs = [docs_by_id[doc_id] for doc_id in ids if doc_id in docs_by_id]
+            if docs:
+                exact[index] = docs
+                self._count("exact_lexical")
+        return exact
+
+    def _get_documents(self, ids: List[str]) -> Dict[str, Document]:
+        if not ids:
+            return {}
+        results = self.vector_store._collection.get(ids=list(dict.fromkeys(ids)), include=["documents", "metadatas"])
+        return {
+            doc_id: Document(id=doc_id, page_content=text, metadata=metadata or {})
+            for doc_id, text, metadata in zip(results["ids"], results["documents"], results["metadatas"])
+        }
+
+    @Metrics.timed(RETRIEVAL_DURATION, method="search")
+    def _search(self, queries: List[str], query_embeddings: List[List[float]], filters: Optional[Dict[str, Any]], k: int = 2) -> List[List[Document]]:
+        """
+        Vector search grouped by where clause, fused with BM25 ranks when the
+        lexical index is available. Queries whose inferred object filter leaves
+        no hits above RAG_MIN_RELEVANCE_SCORE are searched again with the
+        explicit filters only.
+        """
+        if not queries:
+            return []
+
+        self._count("hybrid" if self.lexical_index is not None else "vector_only", len(queries))
+        wheres = [self.build_where(query, filters) for query in queries]
+        documents = self._search_where(queries, query_embeddings, wheres, k)
+
+        explicit_wheres = [self.build_where(query, filters, infer=False) for query in queries]
+        retry = [index for index, docs in enumerate(documents) if not docs and wheres[index] != explicit_wheres[index]]
+        if retry:
+            retried = self._search_where(
+                [queries[index] for index in retry],
+                [query_embeddings[index] for index in retry],
+                [explicit_wheres[index] for index in retry],
+                k,
+            )
+            for index, docs in zip(retry, retried):
+                documents[index] = docs
+        return documents
+
+    def _search_where(self, queries: List[str], query_embeddings: List[List[float]], wheres: List[Dict[str, Any]], k: int) -> List[List[Document]]:
+        """Run the vector (and BM25) search for each query under its own where clause"""
+        groups: Dict[str, List[int]] = {}
+        for index, where in enumerate(wheres):
+            groups.setdefault(json.dumps(where, sort_keys=True), []).append(index)
+
+        n_results = max(k, RAG_HYBRID_CANDIDATES) if self.lexical_index is not None else k
+        documents: List[List[Document]] = [[] for _ in queries]
+        for indexes in groups.values():
+            results = self._query_collection([query_embeddings[i] for i in indexes], k=n_results, where=wheres[indexes[0]])
+            for index, docs in zip(indexes, self._to_documents(results)):
+                documents[index] = docs
+
+        if self.lexical_index is None:
+            return documents
+
+        fused_ids = []
+        for index, query in enumerate(queries):
+            lexical_ids = self.lexical_index.search(query, where=wheres[index], k=n_results)
+            fused_ids.append(self.reciprocal_rank_fusion([[doc.id for doc in documents[index]], lexical_ids])[:k])
+
+        docs_by_id = {doc.id: doc for docs in documents for doc in docs}
+        docs_by_id.update(self._get_documents([doc_id for ids in fused_ids for doc_id in ids if doc_id not in docs_by_id]))
+        return [[docs_by_id[doc_id] for doc_id in ids if doc_id in docs_by_id] for ids in fused_ids]
+
+    @classmethod
+    def reciprocal_rank_fusion(cls, rankings: List[List[str]]) -> List[str]:
+        """Combine ranked id lists; each list contributes 1 / (RRF_K + rank) per id"""
+        scores: Dict[str, float] = {}
+        for ranking in rankings:
+            for rank, doc_id in enumerate(ranking, start=1):
+                scores[doc_id] = scores.get(doc_id, 0.0) + 1.0 / (cls.RRF_K + rank)
+        return [doc_id for doc_id, _ in sorted(scores.items(), key=lambda item: -item[1])]
+
+    @classmethod
+    def _count(cls, counter: str, amount: int = 1) -> None:
+        with cls._lock:
+            cls._stats[counter] += amount
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        with cls._lock:
+            return dict(cls._stats)
+
+    def _query_collection(self, query_embeddings: List[List[float]], k: int = 2, where: Optional[Dict[str, Any]] = None) -> dict:
+        """
+        Run a single Chroma query for a group of subquery embeddings
+        
+        Args:
+            query_embeddings: One embedding per decomposed query
+            k: Number of nearest documents per query
+            where: Metadata filter evaluated inside Chroma
+            
+        Returns:
+            dict: Raw Chroma result with one documents/metadatas/distances list per embedding
+        """
+        return self.vector_store._collection.query(
+            query_embeddings=query_embeddings,
+            n_results=k,
+            where=where,
+            include=["documents", "metadatas", "distances"],
+        )
+
+    def _to_documents(self, results: dict) -> List[List[Document]]:
+        """Convert a Chroma result into Documents, dropping hits below RAG_MIN_RELEVANCE_SCORE"""
+        relevance_score = self.vector_store._select_relevance_score_fn()
+        documents = []
+        for ids, texts, metadatas, distances in zip(results["ids"], results["documents"], results["metadatas"], results["distances"]):
+            documents.append([
+                Document(id=doc_id, page_content=text, metadata=metadata or {})
+                for doc_id, text, metadata, distance in zip(ids, texts, metadatas, distances)
+                if relevance_score(distance) >= RAG_MIN_RELEVANCE_SCORE
+            ])
+        return documents
+
+    def _append_contexts(self, rag_contexts: list, query: str, contexts: List[Document]) -> None:
+        if contexts:
+            # Filter contexts to only include documents with valid data_fields
+            filtered_contexts = []
+            for doc in contexts:
+                # A single data field is flattened into data_fields_<key> entries by _clean_metadata
+                if any(key.startswith("data_fields_") for key in doc.metadata):
+                    filtered_contexts.append(doc)
+                elif "data_fields" in doc.metadata:
+                    data_field = doc.metadata["data_fields"]
+                    # Check if data_field is valid (not None, not empty list, not empty string)
+                    if data_field is not None and data_field != "" and not (isinstance(data_field, list) and len(data_field) == 0):
+                        filtered_contexts.append(doc)
+            
+            # Only append if we have valid contexts with data_fields
+            if filtered_contexts:
+                rag_contexts.append({"query": query, "contexts": filtered_contexts})
@@ -1,24 +1,260 @@
 import os
 import json
+import time
+import hashlib
 from langchain_chroma import Chroma
 from langchain.schema import Document
 from agents.llm_factory import LLMFactory
+from config import EMBEDDING_PROVIDER
+from agents.rag_builder.ingestion_pipeline import IngestionPipeline
+from agents.rag_builder.lexical_index import LexicalIndex
 
 
 class VectorStore:
-    def __init__(self):
-        self.embeddings = LLMFactory().open_ai_embeddings()
+    # Marker file rewritten whenever the index changes; readers compare its stamp
+    INDEX_VERSION_FILE = "index_version"
+    # Content-hash ids currently stored in each collection, used for incremental rebuilds
+    MANIFEST_FILE = "index_manifest_{collection}.json"
+    # Ids appended per upserted batch during a sync, compacted into the manifest when it ends
+    CHECKPOINT_FILE = "index_manifest_{collection}.checkpoint"
+    COLLECTION_NAME = "worknext_agent"
+    UPSERT_BATCH_SIZE = 256
+    # Documents read per collection.get() when rebuilding the lexical index
+    LEXICAL_PAGE_SIZE = 1000
+
+    def __init__(self, provider=None):
+        self.provider = (provider or EMBEDDING_PROVIDER).lower()
+        self.embeddings = LLMFactory.embeddings(self.provider)
+        self.collection_name = self.collection_name_for(self.provider)
         self.store_directory = self._get_vector_db_path()
         self.vector_store_instance = None
         
-    def _get_vector_db_path(self):
-        """Get the absolute path for the local vector database"""
+    @staticmethod
+    def default_store_directory():
+        """Absolute path of the local vector database, without creating it"""
         # Get the current working directory or app directory
         current_dir = os.path.dirname(os.path.abspath(__file__))
         # Go up to the app directory (assuming this file is in app/agents/rag_builder/)
         app_dir = os.path.dirname(os.path.dirname(current_dir))
         # Create the local_vector_db path
-        vector_db_path = os.path.join(app_dir, "local_vector_db")
+        return os.path.join(app_dir, "local_vector_db")
+
+    @classmethod
+    def collection_name_for(cls, provider) -> str:
+        """Each embedding provider gets its own collection since vector sizes differ"""
+        return cls.COLLECTION_NAME if provider == "openai" else f"{cls.COLLECTION_NAME}_{provider}"
+
+    @classmethod
+    def get_index_version(cls, persist_directory=None) -> str:
+        """
+        Cheap stamp that changes every time the index is rebuilt or deleted
+        
+        Returns:
+            str: Content of the version marker, or "0" when the index was never stamped
+        """
+        if persist_directory is None:
+            persist_directory = cls.default_store_directory()
+        try:
+            with open(os.path.join(persist_directory, cls.INDEX_VERSION_FILE), "r", encoding="utf-8") as file:
+                return file.read().strip() or "0"
+        except OSError:
+            return "0"
+
+    @classmethod
+    def mark_index_changed(cls, persist_directory=None) -> str:
+        """Write a new version stamp so caches built on the old index are dropped"""
+        if persist_directory is None:
+            persist_directory = cls.default_store_directory()
+        os.makedirs(persist_directory, exist_ok=True)
+        version = str(time.time_ns())
+        with open(os.path.join(persist_directory, cls.INDEX_VERSION_FILE), "w", encoding="utf-8") as file:
+            file.write(version)
+        return version
+
+    @staticmethod
+    def content_id(page_content, metadata) -> str:
+        """Stable document id derived from the query text and its metadata"""
+        payload = json.dumps({"page_content": page_content, "metadata": metadata}, sort_keys=True, default=str)
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def load_manifest(self, persist_directory=None):
+        """
+        Read the ids recorded by the last sync
+        
+        Ids checkpointed by a sync that was interrupted before compacting its
+        log are included, so the next sync does not embed them again.
+        
+        Returns:
+            set or None: Stored ids, or None when no manifest exists yet
+        """
+        if persist_directory is None:
+            persist_directory = self.store_directory
+        try:
+            with open(self._manifest_path(persist_directory), "r", encoding="utf-8") as file:
+                manifest = json.load(file)
+            if manifest.get("collection") != self.collection_name:
+                return None
+        except (OSError, ValueError):
+            return None
+
+        ids = set(manifest.get("ids", []))
+        try:
+            with open(self._checkpoint_path(persist_directory), "r", encoding="utf-8") as file:
+                ids.update(line.strip() for line in file if line.strip())
+        except OSError:
+            pass
+        return ids
+
+    def _manifest_path(self, persist_directory):
+        return os.path.join(persist_directory, self.MANIFEST_FILE.format(collection=self.collection_name))
+
+    def _checkpoint_path(self, persist_directory):
+        return os.path.join(persist_directory, self.CHECKPOINT_FILE.format(collection=self.collection_name))
+
+    def append_checkpoint(self, ids, persist_directory=None):
+        """Append one batch of written ids to the checkpoint log; cost is O(batch), not O(manifest)"""
+        if persist_directory is None:
+            persist_directory = self.store_directory
+        with open(self._checkpoint_path(persist_directory), "a", encoding="utf-8") as file:
+            file.write("".join(f"{doc_id}\n" for doc_id in ids))
+
+    def save_manifest(self, ids, persist_directory=None):
+        """Write the full id set and drop the checkpoint log it now covers"""
+        if persist_directory is None:
+            persist_directory = self.store_directory
+        os.makedirs(persist_directory, exist_ok=True)
+        manifest = {
+            "collection": self.collection_name,
+            "updated_at": time.time(),
+            "ids": sorted(ids),
+        }
+        manifest_path = self._manifest_path(persist_directory)
+        with open(manifest_path + ".tmp", "w", encoding="utf-8") as file:
+            json.dump(manifest, file)
+        os.replace(manifest_path + ".tmp", manifest_path)
+        try:
+            os.remove(self._checkpoint_path(persist_directory))
+        except OSError:
+            pass
+
+    def rebuild_lexical_index(self, vector_store, persist_directory=None) -> int:
+        """
+        Rebuild lexical_index.json from everything stored in the collection
+        
+        Used by the paths that write the collection without going through
+        sync_documents, so RagRetriever never fuses BM25 hits from an older index.
+        
+        Returns:
+            int: Number of documents indexed
+        """
+        if persist_directory is None:
+            persist_directory = self.store_directory
+        lexical_index = LexicalIndex()
+        offset = 0
+        while True:
+            page = vector_store._collection.get(include=["documents", "metadatas"], limit=self.LEXICAL_PAGE_SIZE, offset=offset)
+            for doc_id, text, metadata in zip(page["ids"], page["documents"], page["metadatas"]):
+                lexical_index.add(doc_id, text, metadata or {})
+            if len(page["ids"]) < self.LEXICAL_PAGE_SIZE:
+                break
+            offset += self.LEXICAL_PAGE_SIZE
+        lexical_index.save(persist_directory)
+        return len(lexical_index)
+
+    def sync_documents(self, documents, persist_directory=None):
+        """
+        Bring the collection in line with documents, embedding only what changed
+        
+        Documents are keyed by content_id, so an edited record shows up as one new
+        id plus one removed id. Without a manifest the ids are read from the
+        collection itself, which also clears duplicates left by older full rebuilds.
+        The documents are consumed as a stream by a single IngestionPipeline run:
+        only their ids, their lexical index entries and the batches in flight are
+        kept in memory. When documents is a list, a pre-pass over the ids gives
+        the pipeline the number of new documents, so its progress and ETA cover
+        the whole sync; for other iterables the total is reported as unknown.
+        
+        Args:
+            documents: Iterable over the full current set of documents
+            persist_directory: Optional directory path
+            
+        Returns:
+            dict: Counts of added, failed, deleted and unchanged documents plus ingestion throughput
+        """
+        if persist_directory is None:
+            persist_directory = self.store_directory
+        os.makedirs(persist_directory, exist_ok=True)
+
+        vector_store = Chroma(
+            embedding_function=self.embeddings,
+            collection_name=self.collection_name,
+            persist_directory=persist_directory
+        )
+        self.vector_store_instance = vector_store
+
+        existing = self.load_manifest(persist_directory)
+        if existing is None:
+            existing = set(vector_store._collection.get(include=[])["ids"])
+
+        stored = set(existing)
+        seen = set()
+        pipeline = IngestionPipeline(self.embeddings)
+        lexical_index = LexicalIndex()
+        started_at = time.perf_counter()
+
+        total_new = None
+        if hasattr(documents, "__len__"):
+            new_ids = set()
+            for doc in documents:
+                doc.id = doc.id or self.content_id(doc.page_content, doc.metadata)
+                if doc.id not in existing:
+                    new_ids.add(doc.id)
+            total_new = len(new_ids)
+
+        def checkpoint(batch_ids):
+            # Log every written batch so an interrupted sync resumes from here
+            stored.update(batch_ids)
+            self.append_checkpoint(batch_ids, persist_directory)
+
+        def new_documents():
+            for doc in documents:
+                doc.id = doc.id or self.content_id(doc.page_content, doc.metadata)
+                if doc.id in seen:
+                    continue
+                seen.add(doc.id)
+                lexical_index.add(doc.id, doc.page_content, doc.metadata)
+                if doc.id not in existing:
+                    yield doc
+
+        ingest_stats = pipeline.run(vector_store, new_documents(), on_batch_done=checkpoint, total=total_new)
+        totals = {"added": ingest_stats["ingested"], "failed": ingest_stats["failed"]}
+
+        to_delete = [doc_id for doc_id in existing if doc_id not in seen]
+        for start in range(0, len(to_delete), self.UPSERT_BATCH_SIZE):
+            vector_store.delete(ids=to_delete[start:start + self.UPSERT_BATCH_SIZE])
+        stored.difference_update(to_delete)
+        self.save_manifest(stored, persist_directory)
+        lexical_index.save(persist_directory)
+
+        if totals["added"] or to_delete:
+            self.mark_index_changed(persist_directory)
+
+        elapsed = time.perf_counter() - started_at
+        summary = {
+            "added": totals["added"],
+            "failed": totals["failed"],
+            "deleted": len(to_delete),
+            "unchanged": len(seen.intersection(existing)),
+            "total": len(seen),
+            "docs_per_sec": round(totals["added"] / elapsed, 2) if elapsed > 0 and totals["added"] else 0.0,
+            "retries": pipeline.retries,
+        }
+        print(f"Vector store sync: {summary}")
+        return summary
+
+    def _get_vector_db_path(self):
+        """Get the absolute path for the local vector database"""
+        vector_db_path = self.default_store_directory()
         
         # Ensure the directory exists
         os.makedirs(vector_db_path, exist_ok=True)
@@ -52,7 +288,7 @@ class VectorStore:
             self.vector_store_instance = Chroma.from_documents(
                 documents,
                 self.embeddings,
-                collection_name="worknext_agent",
+                collection_name=self.collection_name,
                 persist_directory=persist_directory
             )
             
@@ -63,6 +299,8 @@ class VectorStore:
             else:
                 print("Vector store auto-persisted (no explicit persist needed)")
 
+            self.rebuild_lexical_index(self.vector_store_instance, persist_directory)
+            self.mark_index_changed(persist_directory)
             return self.vector_store_instance
             
         except Exception as e:
@@ -94,6 +332,8 @@ class VectorStore:
                 print("Existing vector store found. Adding documents to existing store.")
                 # Add documents to existing store
                 existing_store.add_documents(documents)
+                self.rebuild_lexical_index(existing_store, persist_directory)
+                self.mark_index_changed(persist_directory)
                 return existing_store
             else:
                 print("Creating new vector store.")
@@ -125,7 +365,7 @@ class VectorStore:
         try:
             vector_store = Chroma(
                 embedding_function=self.embeddings,
-                collection_name="worknext_agent",
+                collection_name=self.collection_name,
                 persist_directory=persist_directory
             )
             print(f"Loaded existing vector store from: {persist_directory}")
@@ -178,6 +418,8 @@ class VectorStore:
             self.vector_store_instance = None
             print("🧠 Cleared vector store instance reference.")
 
+            self.mark_index_changed(persist_directory)
+
             return True
 
         except Exception as e:
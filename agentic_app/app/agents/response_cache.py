@@ -0,0 +1,70 @@
+import re
+import threading
+from typing import Any, Dict, Optional
+
+from config import AGENT_RESPONSE_CACHE_SIZE, AGENT_RESPONSE_CACHE_TTL
+from agents.rag_builder.vector_store import VectorStore
+from utils.lru_cache import LRUTTLCache
+
+
+class AgentResponseCache:
+    """
+    Process-wide cache of final AgentExecutor responses.
+
+    Entries are keyed on the whitespace/case-normalized query plus the role id.
+    Every lookup compares the vector store's index version with the version the
+    cache was filled against, so rebuilding or deleting the index through
+    /create_vector_store or /delete_vector_store empties the cache in every worker.
+    """
+
+    _cache = LRUTTLCache(max_size=AGENT_RESPONSE_CACHE_SIZE, ttl_seconds=AGENT_RESPONSE_CACHE_TTL)
+    _lock = threading.Lock()
+    _index_version: Optional[str] = None
+    _invalidations = 0
+
+    @staticmethod
+    def normalize_query(user_query: str) -> str:
+        text = re.sub(r"\s+", " ", (user_query or "").casefold())
+        return text.strip(" ?!.")
+
+    @classmethod
+    def _key(cls, user_query: str, role_id: int) -> tuple:
+        return (cls.normalize_query(user_query), int(role_id or 1))
+
+    @classmethod
+    def _check_index_version(cls) -> None:
+        version = VectorStore.get_index_version()
+        if version == cls._index_version:
+            return
+        with cls._lock:
+            if version != cls._index_version:
+                if cls._index_version is not None:
+                    removed = cls._cache.clear()
+                    cls._invalidations += 1
+                    print(f"Vector index changed, dropped {removed} cached agent responses")
+                cls._index_version = version
+
+    @classmethod
+    def get(cls, user_query: str, role_id: int = 1) -> Optional[Dict[str, Any]]:
+        cls._check_index_version()
+        return cls._cache.get(cls._key(user_query, role_id))
+
+    @classmethod
+    def set(cls, user_query: str, role_id: int, response: Any) -> None:
+        """Store a response unless it carries an error"""
+        if not isinstance(response, dict) or response.get("error") or response.get("subquery_errors"):
+            return
+        cls._check_index_version()
+        cls._cache.set(cls._key(user_query, role_id), response)
+
+    @classmethod
+    def clear(cls) -> int:
+        return cls._cache.clear()
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        stats = cls._cache.stats()
+        stats["ttl_seconds"] = AGENT_RESPONSE_CACHE_TTL
+        stats["index_version"] = cls._index_version
+        stats["invalidations"] = cls._invalidations
+        return stats
@@ -0,0 +1,136 @@
+import os
+import threading
+from typing import Any, Dict, List, Optional, Tuple
+
+from pydantic import BaseModel
+
+from files_handler.file_reader import FileReader
+
+# Sentinel version meaning "never loaded"; a missing file is recorded as None
+NOT_LOADED = (-1, -1)
+
+
+class FieldData(BaseModel):
+    roleid: int
+    object_name: str
+    name: str
+    FieldName: str
+    field_type: str
+
+
+def default_fields_path() -> str:
+    app_dir = os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+    return os.path.join(app_dir, "_local_db_", "orignal_files", "fields.json")
+
+
+class FieldCatalog:
+    """
+    Process-wide, indexed view of fields.json used by the agent field tools.
+
+    The file is parsed once into FieldData objects and three hash indexes:
+    (object, FieldName), (object, label) and object -> fields, with object
+    names and labels casefolded. Every lookup stats the file and rebuilds the
+    indexes when its mtime or size changes, so a re-export of fields.json is picked
+    up without a restart.
+    """
+
+    _lock = threading.Lock()
+    _path: str = default_fields_path()
+    _version: Optional[Tuple[int, int]] = NOT_LOADED
+    _fields: List[Dict[str, Any]] = []
+    _by_name: Dict[Tuple[str, str], FieldData] = {}
+    _by_label: Dict[Tuple[str, str], FieldData] = {}
+    _by_object: Dict[str, List[FieldData]] = {}
+    _stats = {"loads": 0, "lookups": 0, "hits": 0, "misses": 0}
+
+    @classmethod
+    def set_path(cls, path: str) -> None:
+        """Point the catalog at another fields.json; the next lookup loads it"""
+        with cls._lock:
+            cls._path = path
+            cls._version = NOT_LOADED
+
+    @staticmethod
+    def _to_field_data(field: Dict[str, Any]) -> FieldData:
+        return FieldData(
+            roleid=field.get("RoleId", 1),
+            object_name=field.get("ObjectName", ""),
+            name=field.get("Label", ""),
+            FieldName=field.get("FieldName", ""),
+            field_type=field.get("FieldType", "")
+        )
+
+    @classmethod
+    def _ensure_loaded(cls) -> None:
+        try:
+            stat = os.stat(cls._path)
+            version = (stat.st_mtime_ns, stat.st_size)
+        except OSError:
+            version = None
+        if version == cls._version:
+            return
+
+        with cls._lock:
+            if version == cls._version:
+                return
+            fields = FileReader().read_json(cls._path) if version is not None else None
+            if not isinstance(fields, list):
+                print(f"Field catalog: no field list at {cls._path}")
+                fields = []
+
+            by_name, by_label, by_object = {}, {}, {}
+            for field in fields:
+                field_data = cls._to_field_data(field)
+                object_key = field_data.object_name.casefold()
+                # First occurrence wins, matching the order the tools used to scan in
+                by_name.setdefault((object_key, field_data.FieldName), field_data)
+                by_label.setdefault((object_key, field_data.name.casefold()), field_data)
+                by_object.setdefault(object_key, []).append(field_data)
+
+            cls._fields = fields
+            cls._by_name, cls._by_label, cls._by_object = by_name, by_label, by_object
+            cls._version = version
+            cls._stats["loads"] += 1
+            print(f"Field catalog loaded {len(fields)} fields for {len(by_object)} objects")
+
+    @classmethod
+    def _count(cls, found: bool) -> None:
+        with cls._lock:
+            cls._stats["lookups"] += 1
+            cls._stats["hits" if found else "misses"] += 1
+
+    @classmethod
+    def all_fields(cls) -> List[Dict[str, Any]]:
+        """Raw fields.json records"""
+        cls._ensure_loaded()
+        return cls._fields
+
+    @classmethod
+    def by_name(cls, object_name: str, field_name: str) -> Optional[FieldData]:
+        cls._ensure_loaded()
+        field = cls._by_name.get(((object_name or "").casefold(), field_name))
+        cls._count(field is not None)
+        return field
+
+    @classmethod
+    def by_label(cls, object_name: str, label: str) -> Optional[FieldData]:
+        cls._ensure_loaded()
+        field = cls._by_label.get(((object_name or "").casefold(), (label or "").casefold()))
+        cls._count(field is not None)
+        return field
+
+    @classmethod
+    def by_object(cls, object_name: str) -> List[FieldData]:
+        cls._ensure_loaded()
+        fields = cls._by_object.get((object_name or "").casefold(), [])
+        cls._count(bool(fields))
+        return list(fields)
+
+    @classmethod
+    def stats(cls) -> Dict[str, Any]:
+        with cls._lock:
+            stats = dict(cls._stats)
+            stats["fields"] = len(cls._fields)
+            stats["objects"] = len(cls._by_object)
+            stats["path"] = cls._path
+        return stats
@@ -1,5 +1,4 @@
-from files_handler.file_loader import FileLoader
-from pydantic import BaseModel
+from agents.tools.field_catalog import FieldCatalog, FieldData
 
 #  {
 #         "ObjectId": 6,
@@ -15,67 +14,24 @@ from pydantic import BaseModel
 #     },
 
 
-class FieldData(BaseModel):
-    roleid: int
-    object_name: str
-    name: str
-    FieldName: str
-    field_type: str
-
 class BaseFieldTool:
+    """Field lookups for the agent tools, answered from the shared FieldCatalog indexes"""
     
-    def __init__(self):
-        self.file_loader = FileLoader()
-    
-    def load_field_files(self) -> dict:
-        """Load all JSON files from the folder."""
-        return self.file_loader.loadJsonFile("fields.json")
+    def load_field_files(self) -> list:
+        """Raw fields.json records, parsed once per file version."""
+        return FieldCatalog.all_fields()
     
     
-    def get_field_by_field_name_and_object(self, field_name: int, object_name: str) -> list[FieldData]:
-        """Get fields by role ID and object name."""
-        all_fields = self.load_field_files()
-        filtered_fields = [
-            FieldData(
-                roleid=field.get("RoleId", 1),
-                object_name=field.get("ObjectName", ""),
-                name=field.get("Label", ""),
-                FieldName=field.get("FieldName", ""),
-                field_type=field.get("FieldType", "")
-            )
-            for field in all_fields
-            if field.get("FieldName", None) == field_name and field.get("ObjectName", "").lower() == object_name.lower()
-        ]
-        return filtered_fields
+    def get_field_by_field_name_and_object(self, field_name: str, object_name: str) -> list[FieldData]:
+        """Get fields by field name and object name."""
+        field = FieldCatalog.by_name(object_name, field_name)
+        return [field] if field is not None else []
     
     def get_field_by_object_name(self, object_name: str) -> list[FieldData]:
-        """Get fields by role ID and object name."""
-        all_fields = self.load_field_files()
-        filtered_fields = [
-            FieldData(
-                roleid=field.get("RoleId", 1),
-                object_name=field.get("ObjectName", ""),
-                name=field.get("Label", ""),
-                FieldName=field.get("FieldName", ""),
-                field_type=field.get("FieldType", "")
-            )
-            for field in all_fields
-            if field.get("ObjectName", "").lower() == object_name.lower()
-        ]
-        return filtered_fields
+        """Get fields by object name."""
+        return FieldCatalog.by_object(object_name)
 
     def get_field_by_object_name_and_label(self, object_name: str, label: str) -> list[FieldData]:
-        """Get fields by role ID, object name, and label."""
-        all_fields = self.load_field_files()
-        filtered_fields = [
-            FieldData(
-                roleid=field.get("RoleId", 1),
-                object_name=field.get("ObjectName", ""),
-                name=field.get("Label", ""),
-                FieldName=field.get("FieldName", ""),
-                field_type=field.get("FieldType", "")
-            )
-            for field in all_fields
-            if field.get("ObjectName", "").lower() == object_name.lower() and field.get("Label", "").lower() == label.lower()
-        ]
-        return filtered_fields
\ No newline at end of file
+        """Get fields by object name and label."""
+        field = FieldCatalog.by_label(object_name, label)
+        return [field] if field is not None else []
@@ -0,0 +1,104 @@
+import threading
+import time
+from typing import Any, Dict, Optional
+from uuid import UUID
+
+from langchain_core.callbacks import BaseCallbackHandler
+from langchain_core.outputs import LLMResult
+
+
+class StageUsageHandler(BaseCallbackHandler):
+    """Callback attached to one agent stage's chain; forwards usage to UsageTracker"""
+
+    def __init__(self, stage: str):
+        self.stage = stage
+        self._started: Dict[UUID, float] = {}
+
+    def on_chat_model_start(self, serialized, messages, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_start(self, serialized, prompts, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started[run_id] = time.perf_counter()
+
+    def on_llm_end(self, response: LLMResult, *, run_id: UUID, **kwargs: Any) -> None:
+        started = self._started.pop(run_id, None)
+        latency_ms = (time.perf_counter() - started) * 1000 if started is not None else 0.0
+        UsageTracker.record(self.stage, UsageTracker.extract_usage(response), latency_ms)
+
+    def on_llm_error(self, error: BaseException, *, run_id: UUID, **kwargs: Any) -> None:
+        self._started.pop(run_id, None)
+
+
+class UsageTracker:
+    """
+    Per-stage LLM token accounting, including prompt tokens served from the
+    provider's prefix cache.
+
+    Stages attach UsageTracker.callback("<stage>") to their chain; the numbers
+    are reported by /agent_stats so the effect of the prompt layout on cached
+    tokens and latency can be checked per stage.
+    """
+
+    _lock = threading.Lock()
+    _handlers: Dict[str, StageUsageHandler] = {}
+    _stages: Dict[str, Dict[str, float]] = {}
+
+    @classmethod
+    def callback(cls, stage: str) -> StageUsageHandler:
+        handler = cls._handlers.get(stage)
+        if handler is None:
+            with cls._lock:
+                handler = cls._handlers.setdefault(stage, StageUsageHandler(stage))
+        return handler
+
+    @staticmethod
+    def extract_usage(response: LLMResult) -> Dict[str, int]:
+        """Read prompt, cached and completion tokens from a chat model result"""
+        for generations in response.generations:
+            for generation in generations:
+                usage = getattr(getattr(generation, "message", None), "usage_metadata", None)
+                if usage:
+                    details = usage.get("input_token_details") or {}
+                    return {
+                        "prompt_tokens": usage.get("input_tokens", 0),
+                        "cached_tokens": details.get("cache_read", 0) or 0,
+                        "completion_tokens": usage.get("output_tokens", 0),
+                    }
+
+        token_usage = (response.llm_output or {}).get("token_usage") or {}
+        details = token_usage.get("prompt_tokens_details") or {}
+        return {
+            "prompt_tokens": token_usage.get("prompt_tokens", 0),
+            "cached_tokens": details.get("cached_tokens", 0) or 0,
+            "completion_tokens": token_usage.get("completion_tokens", 0),
+        }
+
+    @classmethod
+    def record(cls, stage: str, usage: Dict[str, int], latency_ms: float = 0.0) -> None:
+        with cls._lock:
+            totals = cls._stages.setdefault(stage, {
+                "calls": 0, "prompt_tokens": 0, "cached_tokens": 0, "completion_tokens": 0, "latency_ms": 0.0,
+            })
+            totals["calls"] += 1
+            totals["prompt_tokens"] += usage.get("prompt_tokens", 0)
+            totals["cached_tokens"] += usage.get("cached_tokens", 0)
+            totals["completion_tokens"] += usage.get("completion_tokens", 0)
+            totals["latency_ms"] += latency_ms
+
+    @classmethod
+    def stats(cls, stage: Optional[str] = None) -> Dict[str, Any]:
+        with cls._lock:
+            snapshot = {name: dict(totals) for name, totals in cls._stages.items()}
+
+        report = {}
+        for name, totals in snapshot.items():
+            calls = totals["calls"] or 1
+            report[name] = {
+                "calls": totals["calls"],
+                "prompt_tokens": totals["prompt_tokens"],
+                "cached_tokens": totals["cached_tokens"],
+                "completion_tokens": totals["completion_tokens"],
+                "cached_ratio": round(totals["cached_tokens"] / totals["prompt_tokens"], 4) if totals["prompt_tokens"] else 0.0,
+                "avg_latency_ms": round(totals["latency_ms"] / calls, 2),
+            }
+        return report.get(stage, {}) if stage is not None else report
@@ -0,0 +1,63 @@
+import os
+
+# Maximum number of decomposed subqueries sent to MainAgent at the same time
+AGENT_SUBQUERY_CONCURRENCY = int(os.getenv("AGENT_SUBQUERY_CONCURRENCY", "4"))
+
+# "parallel" runs query translation and greeting detection as parallel graph
+# branches; "sequential" keeps the original translate -> greeting chain
+AGENT_GRAPH_MODE = os.getenv("AGENT_GRAPH_MODE", "parallel")
+
+# Final agent responses cached per normalized query and role (0 disables)
+AGENT_RESPONSE_CACHE_SIZE = int(os.getenv("AGENT_RESPONSE_CACHE_SIZE", "512"))
+AGENT_RESPONSE_CACHE_TTL = float(os.getenv("AGENT_RESPONSE_CACHE_TTL", "900"))
+
+# Embedding backend: "openai" or "local" (offline hashed n-gram vectors, no network)
+EMBEDDING_PROVIDER = os.getenv("EMBEDDING_PROVIDER", "openai")
+OPENAI_EMBEDDING_MODEL = os.getenv("OPENAI_EMBEDDING_MODEL", "text-embedding-3-large")
+LOCAL_EMBEDDING_DIMENSIONS = int(os.getenv("LOCAL_EMBEDDING_DIMENSIONS", "1024"))
+
+# Query embedding vectors kept in memory per (model, text) as float32 arrays; set
+# EMBEDDING_CACHE_PATH to also persist every vector, including index builds, in a
+# SQLite file shared across restarts and rebuilds
+EMBEDDING_CACHE_SIZE = int(os.getenv("EMBEDDING_CACHE_SIZE", "4096"))
+EMBEDDING_CACHE_PATH = os.getenv("EMBEDDING_CACHE_PATH", "")
+
+# Vector store ingestion: documents per embedding call, parallel embedding calls,
+# and retries per batch on rate limits or transient API errors
+RAG_INGEST_BATCH_SIZE = int(os.getenv("RAG_INGEST_BATCH_SIZE", "64"))
+RAG_INGEST_CONCURRENCY = int(os.getenv("RAG_INGEST_CONCURRENCY", "4"))
+RAG_INGEST_MAX_RETRIES = int(os.getenv("RAG_INGEST_MAX_RETRIES", "5"))
+
+# Retrieval filters: hits scoring below RAG_MIN_RELEVANCE_SCORE are dropped and
+# RAG_FILTER_BY_ROLE limits patterns to the caller's role_id. RAG_INFER_OBJECT_FILTER
+# (off by default) also narrows a subquery to the object it names, falling back to
+# the explicit filters when that finds nothing
+RAG_MIN_RELEVANCE_SCORE = float(os.getenv("RAG_MIN_RELEVANCE_SCORE", "0"))
+RAG_INFER_OBJECT_FILTER = os.getenv("RAG_INFER_OBJECT_FILTER", "false").lower() == "true"
+RAG_FILTER_BY_ROLE = os.getenv("RAG_FILTER_BY_ROLE", "false").lower() == "true"
+
+# Hybrid retrieval: BM25 over pattern text and field names fused with vector
+# results; RAG_HYBRID_CANDIDATES is how many hits each side contributes
+RAG_HYBRID_SEARCH = os.getenv("RAG_HYBRID_SEARCH", "true").lower() == "true"
+RAG_HYBRID_CANDIDATES = int(os.getenv("RAG_HYBRID_CANDIDATES", "10"))
+
+# Shared keep-alive HTTP pool for every OpenAI chat and embeddings client
+LLM_HTTP_MAX_CONNECTIONS = int(os.getenv("LLM_HTTP_MAX_CONNECTIONS", "20"))
+LLM_HTTP_MAX_KEEPALIVE = int(os.getenv("LLM_HTTP_MAX_KEEPALIVE", "10"))
+LLM_HTTP_KEEPALIVE_EXPIRY = float(os.getenv("LLM_HTTP_KEEPALIVE_EXPIRY", "60"))
+LLM_HTTP_TIMEOUT = float(os.getenv("LLM_HTTP_TIMEOUT", "60"))
+LLM_HTTP_CONNECT_TIMEOUT = float(os.getenv("LLM_HTTP_CONNECT_TIMEOUT", "5"))
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "2"))
+
+# Rows pulled per fetchmany() call by DatabaseConnection.iter_query
+DB_FETCH_BATCH_SIZE = int(os.getenv("DB_FETCH_BATCH_SIZE", "200"))
+
+# Pooled SQL Server connections: at most DB_POOL_SIZE open, checkouts wait up to
+# DB_POOL_TIMEOUT seconds, and connections idle longer than DB_POOL_PING_AFTER
+# seconds are checked with SELECT 1 before reuse
+DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+DB_POOL_TIMEOUT = float(os.getenv("DB_POOL_TIMEOUT", "30"))
+DB_POOL_PING_AFTER = float(os.getenv("DB_POOL_PING_AFTER", "30"))
+
+# Worker processes used by LayoutService.create_layouts (1 runs in-process)
+LAYOUT_EXTRACT_WORKERS = int(os.getenv("LAYOUT_EXTRACT_WORKERS", str(min(8, os.cpu_count() or 1))))
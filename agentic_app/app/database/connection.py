@@ -1,26 +1,42 @@
 import os
+import time
+from collections import deque
+from contextlib import contextmanager
 from dotenv import load_dotenv
 import pyodbc
 import threading
-from typing import Optional
+from typing import Any, Dict, Iterator, Optional
+from config import DB_FETCH_BATCH_SIZE, DB_POOL_SIZE, DB_POOL_TIMEOUT, DB_POOL_PING_AFTER
+from utils.metrics import Metrics
 
 load_dotenv()
 
+POOL_WAIT = "db_pool_wait_seconds"
+Metrics.describe(POOL_WAIT, "histogram", "Time spent waiting to check out a pooled database connection")
+
 
 class DatabaseConnection:
-    """Singleton database connection class for SQL Server"""
-    
+    """
+    Singleton SQL Server access point backed by a bounded connection pool.
+
+    pyodbc connections must not be used by two threads at once, so every query
+    checks out its own connection for its duration and returns it afterwards.
+    At most DB_POOL_SIZE connections are open; further checkouts wait up to
+    DB_POOL_TIMEOUT seconds. Connections idle for longer than DB_POOL_PING_AFTER
+    are checked with SELECT 1 before reuse, and connections that fail with a
+    connection error are discarded and replaced.
+    """
+
     _instance: Optional['DatabaseConnection'] = None
     _lock = threading.Lock()
-    _connection: Optional[pyodbc.Connection] = None
-    
+
     def __new__(cls) -> 'DatabaseConnection':
         if cls._instance is None:
             with cls._lock:
                 if cls._instance is None:
                     cls._instance = super(DatabaseConnection, cls).__new__(cls)
         return cls._instance
-    
+
     def __init__(self):
         if not hasattr(self, '_initialized'):
             self._initialized = True
@@ -31,63 +47,261 @@ class DatabaseConnection:
                 f"UID={os.getenv('DB_USER_NAME')};"
                 f"PWD={os.getenv('DB_PASSWORD')};"
             )
-    
-    def get_connection(self) -> pyodbc.Connection:
-        """Get database connection, create if doesn't exist"""
-        if self._connection is None or self._connection.closed:
+            self.pool_size = max(1, DB_POOL_SIZE)
+            self._pool_condition = threading.Condition(threading.Lock())
+            # (connection, last returned at) for connections not checked out
+            self._idle: deque = deque()
+            self._open = 0
+            self._in_use = 0
+            self._stats = {
+                "checkouts": 0, "waits": 0, "timeouts": 0, "wait_ms_total": 0.0, "wait_ms_max": 0.0,
+                "connects": 0, "reconnects": 0, "liveness_failures": 0, "peak_in_use": 0,
+            }
+
+    def _connect(self) -> pyodbc.Connection:
+        try:
+            connection = pyodbc.connect(self._connection_string)
+            print("Database connection established successfully")
+            return connection
+        except pyodbc.Error as e:
+            print(f"Error connecting to database: {e}")
+            raise
+
+    @staticmethod
+    def _is_connection_error(error: Exception) -> bool:
+        """Errors after which the connection cannot be reused (SQLSTATE class 08 = connection exception)"""
+        if isinstance(error, (pyodbc.OperationalError, pyodbc.InterfaceError)):
+            return True
+        return bool(error.args) and str(error.args[0]).startswith("08")
+
+    @staticmethod
+    def _is_alive(connection: pyodbc.Connection) -> bool:
+        try:
+            cursor = connection.cursor()
+            try:
+                cursor.execute("SELECT 1")
+                cursor.fetchone()
+            finally:
+                cursor.close()
+            return True
+        except pyodbc.Error:
+            return False
+
+    @staticmethod
+    def _discard(connection: pyodbc.Connection) -> None:
+        try:
+            connection.close()
+        except pyodbc.Error:
+            pass
+
+    def _checkout(self, timeout: float) -> pyodbc.Connection:
+        started = time.perf_counter()
+        waited = False
+        with self._pool_condition:
+            while not self._idle and self._open >= self.pool_size:
+                remaining = timeout - (time.perf_counter() - started)
+                if remaining <= 0:
+                    self._stats["timeouts"] += 1
+                    raise TimeoutError(f"No database connection available within {timeout}s (pool size {self.pool_size})")
+                waited = True
+                self._pool_condition.wait(remaining)
+
+            idle = self._idle.popleft() if self._idle else None
+            if idle is None:
+                # Reserve the slot now and connect outside the lock
+                self._open += 1
+            self._in_use += 1
+            wait_ms = (time.perf_counter() - started) * 1000
+            self._stats["checkouts"] += 1
+            self._stats["waits"] += int(waited)
+            self._stats["wait_ms_total"] += wait_ms
+            self._stats["wait_ms_max"] = max(self._stats["wait_ms_max"], wait_ms)
+            self._stats["peak_in_use"] = max(self._stats["peak_in_use"], self._in_use)
+        Metrics.observe(POOL_WAIT, wait_ms / 1000)
+
+        try:
+            if idle is not None:
+                connection, returned_at = idle
+                if not connection.closed and (
+                    time.monotonic() - returned_at < DB_POOL_PING_AFTER or self._is_alive(connection)
+                ):
+                    return connection
+                self._discard(connection)
+                with self._pool_condition:
+                    self._stats["liveness_failures"] += 1
+                    self._stats["reconnects"] += 1
+            connection = self._connect()
+            with self._pool_condition:
+                self._stats["connects"] += 1
+            return connection
+        except BaseException:
+            self._release_slot()
+            raise
+
+    def _release_slot(self) -> None:
+        with self._pool_condition:
+            self._open -= 1
+            self._in_use -= 1
+            self._pool_condition.notify()
+
+    def _checkin(self, connection: pyodbc.Connection, broken: bool = False) -> None:
+        if broken or connection.closed:
+            self._discard(connection)
+            self._release_slot()
+            return
+        with self._pool_condition:
+            self._in_use -= 1
+            self._idle.append((connection, time.monotonic()))
+            self._pool_condition.notify()
+
+    @contextmanager
+    def connection(self, timeout: float = None) -> Iterator[pyodbc.Connection]:
+        """
+        Check out a pooled connection for the duration of the with-block
+
+        The connection is discarded when the block fails with a connection error.
+        Otherwise it is rolled back, also on success, before it goes back to the
+        pool: with autocommit off even a SELECT opens a transaction, and the next
+        borrower must not inherit it or its locks. Writes commit inside the block.
+
+        Args:
+            timeout: Seconds to wait for a free connection, defaults to DB_POOL_TIMEOUT
+        """
+        connection = self._checkout(DB_POOL_TIMEOUT if timeout is None else timeout)
+        broken = False
+        try:
+            yield connection
+        except Exception as e:
+            broken = isinstance(e, pyodbc.Error) and self._is_connection_error(e)
+            raise
+        finally:
+            if not broken:
+                try:
+                    connection.rollback()
+                except pyodbc.Error:
+                    broken = True
+            self._checkin(connection, broken)
+
+    @contextmanager
+    def cursor(self, timeout: float = None) -> Iterator[pyodbc.Cursor]:
+        """Cursor on a pooled connection, closed before the connection is returned"""
+        with self.connection(timeout) as connection:
+            cursor = connection.cursor()
             try:
-                self._connection = pyodbc.connect(self._connection_string)
-                print("Database connection established successfully")
+                yield cursor
+            finally:
+                cursor.close()
+
+    def execute_query(self, query: str, params: tuple = None) -> list:
+        """Execute a SELECT query and return results; retried once on a fresh connection after a connection error"""
+        for attempt in range(2):
+            try:
+                with self.cursor() as cursor:
+                    if params:
+                        cursor.execute(query, params)
+                    else:
+                        cursor.execute(query)
+                    return cursor.fetchall()
             except pyodbc.Error as e:
-                print(f"Error connecting to database: {e}")
+                if attempt == 0 and self._is_connection_error(e):
+                    print(f"Database connection lost, retrying query: {e}")
+                    continue
+                print(f"Error executing query: {e}")
                 raise
-        return self._connection
-    
-    def get_cursor(self) -> pyodbc.Cursor:
-        """Get a cursor from the connection"""
-        return self.get_connection().cursor()
-    
-    def execute_query(self, query: str, params: tuple = None) -> list:
-        """Execute a SELECT query and return results"""
-        cursor = self.get_cursor()
+
+    def iter_query(self, query: str, params: tuple = None, batch_size: int = None) -> Iterator[pyodbc.Row]:
+        """
+        Execute a SELECT query and yield its rows, fetching batch_size rows at a time
+
+        Only one batch is held in memory, so large columns (e.g. LayoutXML) can be
+        processed row by row. The generator holds its own pooled connection until
+        it is exhausted or closed, so other queries can run while it streams.
+        """
+        batch_size = batch_size or DB_FETCH_BATCH_SIZE
         try:
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            return cursor.fetchall()
+            with self.cursor() as cursor:
+                if params:
+                    cursor.execute(query, params)
+                else:
+                    cursor.execute(query)
+                while True:
+                    rows = cursor.fetchmany(batch_size)
+                    if not rows:
+                        break
+                    for row in rows:
+                        yield row
         except pyodbc.Error as e:
             print(f"Error executing query: {e}")
             raise
-        finally:
-            cursor.close()
-    
+
     def execute_non_query(self, query: str, params: tuple = None) -> int:
         """Execute INSERT, UPDATE, DELETE queries and return affected rows"""
-        cursor = self.get_cursor()
         try:
-            if params:
-                cursor.execute(query, params)
-            else:
-                cursor.execute(query)
-            affected_rows = cursor.rowcount
-            self._connection.commit()
-            return affected_rows
+            with self.connection() as connection:
+                cursor = connection.cursor()
+                try:
+                    if params:
+                        cursor.execute(query, params)
+                    else:
+                        cursor.execute(query)
+                    affected_rows = cursor.rowcount
+                    connection.commit()
+                    return affected_rows
+                finally:
+                    cursor.close()
         except pyodbc.Error as e:
-            self._connection.rollback()
             print(f"Error executing non-query: {e}")
             raise
-        finally:
-            cursor.close()
-    
+
+    def stats(self) -> Dict[str, Any]:
+        """Pool size, current use and checkout wait times"""
+        with self._pool_condition:
+            stats = dict(self._stats)
+            stats.update({
+                "pool_size": self.pool_size,
+                "open": self._open,
+                "in_use": self._in_use,
+                "idle": len(self._idle),
+                "utilization": round(self._in_use / self.pool_size, 4),
+            })
+        stats["wait_ms_avg"] = round(stats["wait_ms_total"] / stats["checkouts"], 2) if stats["checkouts"] else 0.0
+        stats["wait_ms_total"] = round(stats["wait_ms_total"], 2)
+        stats["wait_ms_max"] = round(stats["wait_ms_max"], 2)
+        return stats
+
     def close_connection(self):
-        """Close the database connection"""
-        if self._connection and not self._connection.closed:
-            self._connection.close()
+        """Close every idle pooled connection (used at shutdown); checked-out connections are returned to the pool as usual"""
+        with self._pool_condition:
+            idle = list(self._idle)
+            self._idle.clear()
+            self._open -= len(idle)
+            self._pool_condition.notify_all()
+        for connection, _ in idle:
+            self._discard(connection)
+        if idle:
             print("Database connection closed")
-    
+
     def __del__(self):
         """Destructor to ensure connection is closed"""
-        if hasattr(self, '_connection'):
+        if hasattr(self, '_idle'):
             self.close_connection()
 
+
+def collect_pool_metrics():
+    """Pool gauges and counters for /metrics, once the pool has been created"""
+    instance = DatabaseConnection._instance
+    if instance is None or not hasattr(instance, "_stats"):
+        return []
+    stats = instance.stats()
+    return [
+        ("db_pool_size", "gauge", "Maximum pooled database connections", [({}, stats["pool_size"])]),
+        ("db_pool_connections", "gauge", "Pooled database connections by state",
+         [({"state": "in_use"}, stats["in_use"]), ({"state": "idle"}, stats["idle"])]),
+        ("db_pool_utilization", "gauge", "Checked-out share of the pool", [({}, stats["utilization"])]),
+        ("db_pool_checkouts_total", "counter", "Connection checkouts", [({}, stats["checkouts"])]),
+        ("db_pool_timeouts_total", "counter", "Checkouts that gave up waiting", [({}, stats["timeouts"])]),
+        ("db_pool_reconnects_total", "counter", "Connections replaced after failing a liveness check", [({}, stats["reconnects"])]),
+    ]
+
+
+Metrics.register_collector(collect_pool_metrics)
@@ -0,0 +1,45 @@
+from enum_helper.object_list import object_list
+
+# Words users type for each CRM object, keyed by the names used in object_list
+object_synonyms = {
+    "Task": ["task", "tasks", "todo", "todos"],
+    "Event": ["event", "events", "appointment", "appointments", "meeting", "meetings"],
+    "Survey": ["survey", "surveys"],
+    "Note": ["note", "notes"],
+    "Contact": ["contact", "contacts", "customer", "customers"],
+    "Lead": ["lead", "leads", "prospect", "prospects", "लीड"],
+    "Account": ["account", "accounts", "company", "companies", "client", "clients"],
+    "Opportunity": ["opportunity", "opportunities", "oppty", "deal", "deals"],
+    "Case": ["case", "cases", "ticket", "tickets", "complaint", "complaints"],
+    "Issue": ["issue", "issues", "mailing list"],
+    "Product": ["product", "products"],
+    "Activity": ["activity", "activities"],
+    "Contract": ["contract", "contracts"],
+}
+
+# CRM records mentioned in the prompts that are not part of object_list
+crm_terms = [
+    "quote", "quotes", "invoice", "invoices", "solution", "solutions",
+    "campaign", "campaigns", "user", "users",
+    "record", "records", "report", "reports", "listing", "listings",
+    "field", "fields", "pipeline", "status",
+]
+
+# Verbs that start a data request, including common Hinglish forms
+crm_actions = [
+    "show", "list", "get", "fetch", "find", "display", "give", "view",
+    "count", "sum", "summarize", "group", "sort", "filter", "search",
+    "top", "bottom", "latest", "open", "closed", "create", "update", "delete",
+    "dikhao", "dikha", "batao", "bata", "chahiye",
+]
+
+
+def build_object_vocabulary() -> dict:
+    """Map every lower-cased object name and synonym to its object_list name"""
+    vocabulary = {}
+    for object_name in object_list.values():
+        vocabulary[object_name.casefold()] = object_name
+    for object_name, words in object_synonyms.items():
+        for word in words:
+            vocabulary[word.casefold()] = object_name
+    return vocabulary
@@ -0,0 +1,97 @@
+"""
+Embedding backend benchmark - build time, query latency and retrieval recall
+
+Run from the app directory:
+    python examples/embedding_benchmark.py --providers local openai --queries 100
+
+Every provider indexes the same rag_output_files documents into its own
+temporary Chroma directory. Queries are derived from the pattern text (lower
+cased, "Show my" and one word dropped), and a hit counts when a document with
+the original pattern text comes back in the top k.
+"""
+import argparse
+import os
+import random
+import statistics
+import sys
+import tempfile
+import time
+
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.rag_builder.rag_builder import RagBuilder
+from agents.rag_builder.vector_store import VectorStore
+
+
+def make_queries(documents, count, seed=7):
+    """Pick distinct pattern texts and turn them into slightly reworded queries"""
+    rng = random.Random(seed)
+    texts = sorted({" ".join(doc.page_content.split()) for doc in documents})
+    rng.shuffle(texts)
+
+    queries = []
+    for text in texts[:count]:
+        words = [word for word in text.lower().split() if word not in ("show", "my")]
+        if len(words) > 2:
+            words.pop(rng.randrange(1, len(words)))
+        queries.append((" ".join(words), text))
+    return queries
+
+
+def benchmark_provider(provider, documents, queries, k):
+    persist_directory = tempfile.mkdtemp(prefix=f"bench_{provider}_")
+    store = VectorStore(provider)
+
+    started = time.perf_counter()
+    store.sync_documents(list(documents), persist_directory=persist_directory)
+    build_seconds = time.perf_counter() - started
+
+    vector_store = store.load_existing_vector_store(persist_directory)
+    latencies = []
+    hits = 0
+    for query, expected in queries:
+        started = time.perf_counter()
+        results = vector_store.similarity_search(query, k=k)
+        latencies.append((time.perf_counter() - started) * 1000)
+        if any(" ".join(doc.page_content.split()) == expected for doc in results):
+            hits += 1
+
+    latencies.sort()
+    return {
+        "provider": provider,
+        "documents": len(documents),
+        "build_seconds": round(build_seconds, 2),
+        "docs_per_sec": round(len(documents) / build_seconds, 1) if build_seconds else 0.0,
+        "query_ms_mean": round(statistics.mean(latencies), 2),
+        "query_ms_p95": round(latencies[int(0.95 * (len(latencies) - 1))], 2),
+        f"recall@{k}": round(hits / len(queries), 3),
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compare embedding backends on the RAG corpus")
+    parser.add_argument("--providers", nargs="+", default=["local", "openai"])
+    parser.add_argument("--queries", type=int, default=100)
+    parser.add_argument("--k", type=int, default=3)
+    args = parser.parse_args()
+
+    providers = list(args.providers)
+    if "openai" in providers and not os.getenv("OPENAI_API_KEY"):
+        print("OPENAI_API_KEY is not set, skipping the openai backend")
+        providers.remove("openai")
+
+    documents = RagBuilder(vector_store=VectorStore("local")).get_vector_documents()
+    queries = make_queries(documents, args.queries)
+    print(f"Benchmarking {len(documents)} documents with {len(queries)} queries")
+
+    results = [benchmark_provider(provider, documents, queries, args.k) for provider in providers]
+
+    columns = list(results[0].keys()) if results else []
+    print()
+    print(" | ".join(f"{column:>14}" for column in columns))
+    for row in results:
+        print(" | ".join(f"{str(row[column]):>14}" for column in columns))
+
+
+if __name__ == "__main__":
+    main()
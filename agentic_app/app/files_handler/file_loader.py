@@ -1,5 +1,5 @@
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, List, Optional
 from .file_reader import FileReader
 import os
 
@@ -133,6 +133,13 @@ class FileLoader:
             print(f"Failed to load JSON file: {filename}")
             return None
         
+    def list_layout_files(self) -> List[str]:
+        """Names of the layout JSON files, sorted so runs are reproducible."""
+        if not os.path.isdir(self.original_path_layouts):
+            print(f"Warning: Folder path does not exist: {self.original_path_layouts}")
+            return []
+        return sorted(filename for filename in os.listdir(self.original_path_layouts) if filename.endswith(".json"))
+
     def loadJsonLayoutFile(self, filename: str) -> Optional[Dict[str, Any]]:
         """Load a specific JSON file from the folder."""
         file_path = os.path.join(self.original_path_layouts, filename)
@@ -1,5 +1,5 @@
 import json
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Iterator, Optional, Tuple
 from .file_reader import FileReader
 import os
 
@@ -96,53 +96,63 @@ class RagFileLoader:
                 print("Unsupported file format.")
                 return
             
-    def load_all_files_from_rag_output(self) -> Dict[str, Any]:
+    def iter_rag_output_files(self) -> Iterator[Tuple[str, Any]]:
         """
-        Load all JSON files in the folder.
-        The key will be the filename, and the value will be the JSON content.
+        Yield (filename, json_content) for every JSON file in rag_output_files,
+        reading one file at a time so only the current file is held in memory.
         """
 
         # Check if the folder exists
         if not os.path.exists(self.rag_output_path):
             print(f"Warning: Folder path does not exist: {self.rag_output_path}")
-            return self.data
+            return
 
         if not os.path.isdir(self.rag_output_path):
             print(f"Warning: Path is not a directory: {self.rag_output_path}")
-            return self.data
+            return
 
         try:
-            folder_dir = os.listdir(self.rag_output_path)
-            file_loader = FileReader()
+            folder_dir = sorted(os.listdir(self.rag_output_path))
+        except OSError as e:
+            print(f"Error accessing directory {self.rag_output_path}: {e}")
+            return
 
-            for filename in folder_dir:
-                if filename.endswith(".json"):
-                    file_path = os.path.join(self.rag_output_path, filename)
-                    json_data = file_loader.read_json(file_path)
-                    if json_data is not None:
-                        self.data[filename] = json_data
-                        print(f"Loaded JSON file: {filename}")
-                    else:
-                        print(f"Failed to load JSON file: {filename}")
+        file_loader = FileReader()
+        for filename in folder_dir:
+            if filename.endswith(".json"):
+                file_path = os.path.join(self.rag_output_path, filename)
+                json_data = file_loader.read_json(file_path)
+                if json_data is not None:
+                    print(f"Loaded JSON file: {filename}")
+                    yield filename, json_data
+                else:
+                    print(f"Failed to load JSON file: {filename}")
+
+    def iter_rag_records(self) -> Iterator[Any]:
+        """Yield RAG records one by one across all rag_output_files"""
+        for _, content in self.iter_rag_output_files():
+            if isinstance(content, list):
+                yield from content
+            else:
+                yield content
 
-        except OSError as e:
-            print(f"Error accessing directory {self.folder_path}: {e}")
+    def load_all_files_from_rag_output(self) -> Dict[str, Any]:
+        """
+        Load all JSON files in the folder.
+        The key will be the filename, and the value will be the JSON content.
+        """
+        rag_files: Dict[str, Any] = {}
+        try:
+            for filename, json_data in self.iter_rag_output_files():
+                rag_files[filename] = json_data
         except Exception as e:
             print(f"Unexpected error loading JSON files: {e}")
 
-        return self.data
+        return rag_files
     
     def load_all_rag_files(self):
         try:
-            all_rags = []
-            layouts = self.load_all_files_from_rag_output()
-            if layouts:
-                for layout in layouts.values():
-                    if isinstance(layout, list):
-                        all_rags.extend(layout)
-                    else:
-                        all_rags.append(layout)
-            return all_rags                                                         
+            return list(self.iter_rag_records())
         except Exception as e:
             print(f"Error loading RAG files: {e}")
-            return []
\ No newline at end of file
+            return []
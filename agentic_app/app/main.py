@@ -1,5 +1,7 @@
+from contextlib import asynccontextmanager
 from fastapi import FastAPI
 from fastapi.middleware.cors import CORSMiddleware
+from fastapi.responses import PlainTextResponse
 from routes.get_roles_routes import router as roles_router
 from routes.get_object_routes import router as objects_router
 from routes.get_field_routes import router as fields_router
@@ -9,8 +11,23 @@ from routes.get_listing_routes import router as listing_router
 
 #Agent Routers
 from agents.controllers.agent_controllers import router as agent_routers
+from agents.agent_registry import AgentRegistry
+from agents.llm_factory import LLMFactory
+from agents.agent_metrics import Metrics
+from database.connection import DatabaseConnection
 
-app = FastAPI(title="My Python SQL Server App")
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Build the compiled agent graph, LLM client and Chroma handle once per worker
+    AgentRegistry.startup()
+    yield
+    AgentRegistry.shutdown()
+    await LLMFactory.aclose()
+    DatabaseConnection().close_connection()
+
+
+app = FastAPI(title="My Python SQL Server App", lifespan=lifespan)
 
 app.add_middleware(
     CORSMiddleware,
@@ -29,6 +46,12 @@ app.include_router(meta_router, prefix="/api")
 
 app.include_router(agent_routers, prefix="/api/agents")
 
+
+@app.get("/metrics", include_in_schema=False)
+def metrics():
+    # Prometheus scrape endpoint: node/retrieval latency histograms, token and cache counters
+    return PlainTextResponse(Metrics.render(), media_type="text/plain; version=0.0.4")
+
 if __name__ == "__main__":
     import uvicorn
     
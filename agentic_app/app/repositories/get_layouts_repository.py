@@ -1,4 +1,4 @@
-from typing import Any, Dict, List
+from typing import Any, Dict, Iterator, List
 from database.connection import DatabaseConnection
 from database.query_helper import QueryHelper
 from enum_helper.field_type import field_type_inverted
@@ -22,6 +22,24 @@ class LayoutRepository:
 
         return object_list.get(object_id, "UnknownObject")
 
+    def iter_layout_group(self) -> Iterator[Dict[str, Any]]:
+        """Stream layouts from the LayoutGroupView table one row at a time
+
+        Rows are fetched in DB_FETCH_BATCH_SIZE batches, so only one batch of
+        LayoutXML blobs is in memory. Errors propagate to the caller.
+
+        Yields:
+            Dict[str, Any]: ItemTypeID, LayoutID, LayoutType and LayoutXML of one layout
+        """
+        for obj in self.db.iter_query(QueryHelper.GetLayoutGroupView):
+            # Column names: ItemTypeID, LayoutID, LayoutType, LayoutXML
+            yield {
+                "ItemTypeID": obj.ItemTypeID,
+                "LayoutID": obj.LayoutID,
+                "LayoutType": obj.LayoutType,
+                "LayoutXML": obj.LayoutXML,
+            }
+
     def get_layout_group(self) -> List[Dict[str, Any]]:
         """Get all layouts from the LayoutGroupView table
 
@@ -29,22 +47,7 @@ class LayoutRepository:
             List[Dict[str, Any]]: List of object dictionaries with relevant fields
         """
         try:
-            # Use direct query since QueryHelper might not be available
-            layout_data = self.db.execute_query(QueryHelper.GetLayoutGroupView)
-
-            # Convert tuples to dictionaries for better handling
-            layouts = []
-            for obj in layout_data:
-                # Column names: ItemTypeID, LayoutID, LayoutType, LayoutXML
-                layouts.append(
-                    {
-                        "ItemTypeID": obj.ItemTypeID,
-                        "LayoutID": obj.LayoutID,
-                        "LayoutType": obj.LayoutType,
-                        "LayoutXML": obj.LayoutXML,
-                    }
-                )
-
+            layouts = list(self.iter_layout_group())
             print(f"Successfully fetched {len(layouts)} layouts")
             return layouts
 
@@ -82,6 +85,23 @@ class LayoutRepository:
             print(f"Error fetching layouts: {e}")
             return []  
         
+    def get_layout_ui_names(self) -> Dict[Any, str]:
+        """LayoutID -> UI name from UILayoutMaster; the first row per LayoutID wins
+
+        Returns:
+            Dict[Any, str]: UI names keyed by LayoutID, empty on error
+        """
+        try:
+            ui_names = {}
+            for obj in self.db.iter_query(QueryHelper.GetLayoutUIMaster):
+                ui_names.setdefault(obj.LayoutID, obj.Name)
+            print(f"Successfully fetched {len(ui_names)} layout names")
+            return ui_names
+
+        except Exception as e:
+            print(f"Error fetching layout names: {e}")
+            return {}
+
     def get_layout_role_mapping(self) -> List[Dict[str, Any]]:
         """Get all layouts from the GetLayoutUIMaster table
 
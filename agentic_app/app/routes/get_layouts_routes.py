@@ -13,5 +13,5 @@ def get_layouts():
 @router.get("/create_layouts_5")
 def create_layouts():
     layout_service = LayoutService()
-    layout_service.create_layouts()
-    return {"layouts": "layout file has been created"}
+    stats = layout_service.create_layouts()
+    return {"layouts": "layout file has been created", "stats": stats}
@@ -28,11 +28,11 @@ def get_object_relationship_listing():
 def get_listing_gold5_enriched():
     listing_service = ListingService()
     listing_service.map_object_and_gold5_listing()
-    return {"listing": "listing file has been created"}
+    return {"listing": "listing file has been created", "timings": listing_service.timings.get("gold5", {})}
 
 @router.get("/listing_rpt_enriched")
 def get_listing_rpt_enriched():
     listing_service = ListingService()
     listing_service.map_object_and_rpt_listing()
-    return {"listing": "listing file has been created"}
+    return {"listing": "listing file has been created", "timings": listing_service.timings.get("rpt", {})}
 
@@ -1,8 +1,43 @@
 from csv import reader
+import time
+from concurrent.futures import ProcessPoolExecutor
+from config import LAYOUT_EXTRACT_WORKERS
 from utils.layout_helper import LayoutHelper
 from repositories.get_layouts_repository import LayoutRepository
 from files_handler.file_loader import FileLoader
-from typing import List, Any, Dict
+from typing import List, Any, Dict, Optional
+
+# Per-process state of the layout extraction workers, set by _init_layout_worker
+_worker_state: Dict[str, Any] = {}
+
+
+def _init_layout_worker(field_index: Dict[str, Dict[str, Any]]) -> None:
+    """Pool initializer: the LayoutFieldId index is sent once per worker, not per layout"""
+    _worker_state["helper"] = LayoutHelper()
+    _worker_state["field_index"] = field_index
+
+
+def extract_layout_file(filename: str) -> Dict[str, Any]:
+    """
+    Parse one layout file, write its tabs to output_files/layouts and return its layout fields
+
+    Args:
+        filename: Layout file name in orignal_files/layouts
+
+    Returns:
+        Dict[str, Any]: file, whether tabs were written, the layout_fields entries and any error
+    """
+    helper = _worker_state["helper"]
+    layout_fields = []
+    try:
+        layout = helper.loader.loadJsonLayoutFile(filename)
+        tabs = helper.build_layout(layout, layout_fields, _worker_state["field_index"]) if layout else None
+        if tabs:
+            helper.loader.save_files_for_layouts(filename, tabs)
+        return {"file": filename, "tabs": bool(tabs), "layout_fields": layout_fields, "error": None}
+    except Exception as e:
+        print(f"Error extracting layout {filename}: {e}")
+        return {"file": filename, "tabs": False, "layout_fields": [], "error": str(e)}
 
 
 class LayoutService:
@@ -21,51 +56,44 @@ class LayoutService:
         """
         try:
             
-            # Fetch all required data
-            layout_group = self.repository.get_layout_group()
-            layout_ui_master = self.repository.get_layout_ui_master()
+            # UI names are small, so they are read fully before the layouts stream in
+            ui_names = self.repository.get_layout_ui_names()
             #layout_role_mapping = self.repository.get_layout_role_mapping()
 
             layouts = []
+            saved = 0
             
-            if layout_group:
-                for layout in layout_group:
-                    # Create a copy of the layout to avoid modifying the original
-                    enriched_layout = dict(layout) if isinstance(layout, dict) else layout
-
-                    # Find matching UI master information
-                    ui_master = next(
-                        (ui for ui in layout_ui_master if ui.get("LayoutID") == layout.get("LayoutID")),
-                        None
-                    )
+            # Each layout row (with its LayoutXML) is written and released before the next is fetched
+            for layout in self.repository.iter_layout_group():
+                # Create a copy of the layout to avoid modifying the original
+                enriched_layout = dict(layout) if isinstance(layout, dict) else layout
+
+                # Dictionary join on LayoutID
+                enriched_layout["LayoutName"] = ui_names.get(layout.get("LayoutID"), "Unknown")
                     
-                    if ui_master and isinstance(ui_master, dict):
-                        # Add UI master information to the layout
-                        enriched_layout["LayoutName"] = ui_master.get("UIName", "Unknown")
-                    else:
-                        enriched_layout["LayoutName"] = "Unknown"
-                        
-                    # Find matching role mapping
-                    # role_mapping = next(
-                    #     (r for r in layout_role_mapping if r.get("LayoutId") == layout.get("LayoutID")),
-                    #     None
-                    # )
-
-                    # if role_mapping and isinstance(role_mapping, dict):
-                    #     roleid = role_mapping.get("RoleId", 1)
-                    #     enriched_layout["RoleId"] = roleid
-                    # else:
-                    #     enriched_layout["RoleId"] = 1
-                    enriched_layout["RoleId"] = 1
-                    #xml_json = self.layout_helper.get_field_from_xml(layout.get("LayoutXML", ""), enriched_layout.get("RoleId"))
-                    #enriched_layout["LayoutFields"] = xml_json
-                    #enriched_layout["LayoutXML"] = ""
-                    #layouts.append(enriched_layout)
-                    try:
-                        self.loader.save_files_for_layouts(f"{enriched_layout['LayoutID']}.json", enriched_layout)
-                        print(f"Successfully saved layout to file")
-                    except Exception as save_error:
-                        print(f"Warning: Could not save layout to file: {save_error}")
+                # Find matching role mapping
+                # role_mapping = next(
+                #     (r for r in layout_role_mapping if r.get("LayoutId") == layout.get("LayoutID")),
+                #     None
+                # )
+
+                # if role_mapping and isinstance(role_mapping, dict):
+                #     roleid = role_mapping.get("RoleId", 1)
+                #     enriched_layout["RoleId"] = roleid
+                # else:
+                #     enriched_layout["RoleId"] = 1
+                enriched_layout["RoleId"] = 1
+                #xml_json = self.layout_helper.get_field_from_xml(layout.get("LayoutXML", ""), enriched_layout.get("RoleId"))
+                #enriched_layout["LayoutFields"] = xml_json
+                #enriched_layout["LayoutXML"] = ""
+                #layouts.append(enriched_layout)
+                try:
+                    self.loader.save_files_for_layouts(f"{enriched_layout['LayoutID']}.json", enriched_layout)
+                    saved += 1
+                except Exception as save_error:
+                    print(f"Warning: Could not save layout to file: {save_error}")
+
+            print(f"Successfully saved {saved} layouts to file")
 
             # Save to file using the correct method name
             # try:
@@ -92,16 +120,46 @@ class LayoutService:
             
         return layouts
 
-    def create_layouts(self) -> Dict[str, Any]:
-        files = self.loader.load_all_layouts()
-        layout_fields = []
-        for file in files:
-            print(file)
-            result = self.repository.get_layouts_file(file)
-            tabs = self.layout_helper.build_layout(result, layout_fields)
-            self.loader.save_files_at_output("layout_fields.json", layout_fields)
-            if tabs:
-                self.loader.save_files_for_layouts(file, tabs)
-            # return tabs
-        # If no files, return an empty dict to match the return type
-        return {}
\ No newline at end of file
+    def create_layouts(self, workers: Optional[int] = None) -> Dict[str, Any]:
+        """
+        Extract tabs and fields from every layout file
+
+        fields.json is indexed by LayoutFieldId once, layouts are parsed in a
+        process pool that writes each layout's output, and layout_fields.json
+        is written once at the end in file order.
+
+        Args:
+            workers: Worker processes, defaults to LAYOUT_EXTRACT_WORKERS; 1 runs in-process
+
+        Returns:
+            Dict[str, Any]: Layout counts, failures, workers and layouts/sec
+        """
+        start = time.perf_counter()
+        field_index = self.layout_helper.build_layout_field_index(self.loader.loadJsonFile("fields.json"))
+        files = self.loader.list_layout_files()
+        workers = max(1, min(workers or LAYOUT_EXTRACT_WORKERS, len(files) or 1))
+
+        if workers == 1:
+            _init_layout_worker(field_index)
+            results = [extract_layout_file(file) for file in files]
+        else:
+            chunksize = max(1, len(files) // (workers * 4))
+            with ProcessPoolExecutor(max_workers=workers, initializer=_init_layout_worker, initargs=(field_index,)) as pool:
+                # map() keeps file order, so layout_fields.json is reproducible
+                results = list(pool.map(extract_layout_file, files, chunksize=chunksize))
+
+        layout_fields = [entry for result in results for entry in result["layout_fields"]]
+        self.loader.save_files_at_output("layout_fields.json", layout_fields)
+
+        elapsed = time.perf_counter() - start
+        stats = {
+            "layouts": len(files),
+            "layouts_with_tabs": sum(1 for result in results if result["tabs"]),
+            "failed": [result["file"] for result in results if result["error"]],
+            "layout_fields": len(layout_fields),
+            "workers": workers,
+            "seconds": round(elapsed, 2),
+            "layouts_per_sec": round(len(files) / elapsed, 1) if elapsed else 0.0,
+        }
+        print(f"Layout extraction: {stats}")
+        return stats
\ No newline at end of file
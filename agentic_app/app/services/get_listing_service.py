@@ -1,11 +1,14 @@
 from repositories.get_listing_repository import ListingRepository
 from files_handler.file_loader import FileLoader
-from typing import List, Any
+from typing import Any, Dict, List, Tuple
+import time
 
 class ListingService:
     def __init__(self):
         self.repository = ListingRepository()
         self.loader = FileLoader()
+        # Stage timings of the last map_object_and_*_listing runs, keyed by "gold5" / "rpt"
+        self.timings: Dict[str, Dict[str, Any]] = {}
 
     def get_listing_base(self) -> List[Any]:
         try:
@@ -39,12 +42,33 @@ class ListingService:
         result = self.get_gold5_listing_base()
         return result
     
-    def get_field_by_fieldName_with_object_name(self, fieldList, object_name) -> List[Any]:
+    @staticmethod
+    def _elapsed_ms(start: float) -> float:
+        return round((time.perf_counter() - start) * 1000, 2)
+
+    @staticmethod
+    def build_field_index(all_fields: List[Dict[str, Any]]) -> Dict[Tuple[Any, Any], Dict[str, Any]]:
+        """(ObjectName, FieldName) -> field; the first occurrence wins like the old linear scan"""
+        index = {}
+        for field in all_fields or []:
+            index.setdefault((field.get("ObjectName"), field.get("FieldName")), field)
+        return index
+
+    @staticmethod
+    def build_relationship_index(object_relation: List[Dict[str, Any]]) -> Dict[Tuple[Any, Any], Dict[str, Any]]:
+        """(ObjectId, listingtype) -> relationship; the first occurrence wins"""
+        index = {}
+        for relation in object_relation or []:
+            index.setdefault((relation.get("ObjectId"), relation.get("listingtype")), relation)
+        return index
+
+    def get_field_by_fieldName_with_object_name(self, fieldList, object_name, field_index=None) -> List[Any]:
         fields = []
         try:
-            all_fields = self.loader.loadJsonFile("fields.json")
+            if field_index is None:
+                field_index = self.build_field_index(self.loader.loadJsonFile("fields.json"))
             for field in fieldList:
-                field_info = next((f for f in all_fields if f.get("FieldName") == field and f.get("ObjectName") == object_name), None)
+                field_info = field_index.get((object_name, field))
                 if field_info:
                     extended_field_info = {}
                     extended_field_info["roleid"] = 1
@@ -62,33 +86,42 @@ class ListingService:
     def map_object_and_gold5_listing(self) -> List[Any]:
         try:
             newListing = []
-            
+            timings = {}
+            total_start = time.perf_counter()
+
+            start = time.perf_counter()
             object_relation = self.loader.loadJsonFile("listing_object_relationship.json")
             gold5_listing = self.loader.loadJsonFile("listing_gold5.json")
-            
+            all_fields = self.loader.loadJsonFile("fields.json")
+            timings["load_ms"] = self._elapsed_ms(start)
+
+            start = time.perf_counter()
+            relationship_index = self.build_relationship_index(object_relation)
+            field_index = self.build_field_index(all_fields)
+            timings["index_ms"] = self._elapsed_ms(start)
+
+            start = time.perf_counter()
             if gold5_listing:
                 for listing in gold5_listing:
                     list_id = listing.get("ListingTypeId")
                     object_id = listing.get("RelatedToTypeId")
                     
-                    if object_id and object_relation:
-                        related_object = next((obj for obj in object_relation if obj.get("ObjectId") == object_id and obj.get("listingtype") == list_id), None)
+                    if object_id and relationship_index:
+                        related_object = relationship_index.get((object_id, list_id))
                         if related_object:
-                            listing_modified = {}
-                            listing_modified["ListingName"] = related_object.get("RelationShipName", "")
-                            listing_modified["RelatedName"] = related_object.get("ModifiedListingName", "")
-                            listing_modified["ObjectId"] = related_object.get("ObjectId", "")
-                            listing_modified["ObjectName"] = related_object.get("ObjectName", "")
                             cols = listing.get("DataColumns", [])
                             object_name = related_object.get("ObjectName", "")
-                            fields = self.get_field_by_fieldName_with_object_name(cols, object_name)
+                            fields = self.get_field_by_fieldName_with_object_name(cols, object_name, field_index)
                             newListing.append({
                                 "query_label": related_object.get("ModifiedListingName", ""),
                                 "query_field": fields
                             })
+            timings["join_ms"] = self._elapsed_ms(start)
 
-
+            start = time.perf_counter()
             self.loader.save_files_at_output("listing_gold5.json", newListing)
+            timings["save_ms"] = self._elapsed_ms(start)
+            self._record_timings("gold5", timings, total_start, gold5_listing, newListing)
             return newListing
 
         except Exception as e:
@@ -98,26 +131,48 @@ class ListingService:
     def map_object_and_rpt_listing(self) -> List[Any]:
         try:
             newListing = []
-            
+            timings = {}
+            total_start = time.perf_counter()
+
+            start = time.perf_counter()
             rpt_listing = self.loader.loadJsonFile("listing_rpt.json")
+            all_fields = self.loader.loadJsonFile("fields.json")
+            timings["load_ms"] = self._elapsed_ms(start)
 
+            start = time.perf_counter()
+            field_index = self.build_field_index(all_fields)
+            timings["index_ms"] = self._elapsed_ms(start)
+
+            start = time.perf_counter()
             if rpt_listing:
                 for listing in rpt_listing:
                     object_name = listing.get("ObjectName", "")
                     cols = listing.get("DataColumns", [])
                     listing_name = listing.get("ListingName", "")
-                    fields = self.get_field_by_fieldName_with_object_name(cols, object_name)
+                    fields = self.get_field_by_fieldName_with_object_name(cols, object_name, field_index)
                     newListing.append({
                         "query_label": listing_name,
                         "query_field": fields
                     })
+            timings["join_ms"] = self._elapsed_ms(start)
 
+            start = time.perf_counter()
             self.loader.save_files_at_output("listing_rpt.json", newListing)
+            timings["save_ms"] = self._elapsed_ms(start)
+            self._record_timings("rpt", timings, total_start, rpt_listing, newListing)
             return newListing
 
         except Exception as e:
             print(f"Error in ListingService.get_object_relation_listing: {e}")
             return []
+
+    def _record_timings(self, name: str, timings: Dict[str, Any], total_start: float, source: List[Any], mapped: List[Any]) -> None:
+        timings["total_ms"] = self._elapsed_ms(total_start)
+        timings["listings"] = len(source or [])
+        timings["mapped_listings"] = len(mapped)
+        timings["mapped_fields"] = sum(len(listing["query_field"]) for listing in mapped)
+        self.timings[name] = timings
+        print(f"ListingService {name} mapping timings: {timings}")
     
     def get_object_relation_listing(self) -> List[Any]:
         try:
@@ -0,0 +1,48 @@
+"""
+Tests for the memory and disk tiers of CachedEmbeddings
+"""
+import os
+import sys
+from array import array
+
+# The agent modules import each other relative to the app directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.embeddings import Embeddings
+
+from agents.rag_builder.cached_embeddings import CachedEmbeddings
+
+
+class CountingEmbeddings(Embeddings):
+    def __init__(self):
+        self.texts = []
+
+    def embed_documents(self, texts):
+        self.texts.extend(texts)
+        return [[float(len(text)), 0.5] for text in texts]
+
+    def embed_query(self, text):
+        return self.embed_documents([text])[0]
+
+
+def test_queries_are_kept_as_float32_arrays_in_memory():
+    provider = CountingEmbeddings()
+    cached = CachedEmbeddings(provider, model_name="test", max_size=8)
+
+    assert cached.embed_queries(["show my leads", "show my cases"]) == [[13.0, 0.5], [13.0, 0.5]]
+    assert cached.embed_query("show my leads") == [13.0, 0.5]
+    assert provider.texts == ["show my leads", "show my cases"]
+    stored = cached.memory.get(("test", cached._hash("show my leads")))
+    assert isinstance(stored, array) and stored.typecode == "f"
+
+
+def test_bulk_documents_skip_memory_and_are_served_from_disk(tmp_path):
+    provider = CountingEmbeddings()
+    cached = CachedEmbeddings(provider, model_name="test", max_size=8, disk_path=str(tmp_path / "embeddings.sqlite3"))
+    corpus = [f"pattern {i}" for i in range(20)]
+
+    first = cached.embed_documents(corpus)
+    assert cached.memory.stats()["size"] == 0
+    assert cached.embed_documents(corpus) == first
+    assert len(provider.texts) == 20
+    assert cached.stats()["disk_hits"] == 20
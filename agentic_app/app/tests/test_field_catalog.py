@@ -0,0 +1,59 @@
+"""
+Tests for the indexed field catalog behind the agent field tools
+"""
+import json
+import os
+import sys
+
+import pytest
+
+# The agent modules import each other relative to the app directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.tools.field_catalog import FieldCatalog, default_fields_path
+from agents.tools.get_field_by_field_name import (
+    get_field_by_field_name_and_object,
+    get_field_by_object_name,
+    get_field_by_object_name_and_label,
+)
+
+
+FIELDS = [
+    {"ObjectName": "Lead", "FieldName": "Rating", "Label": "Lead Rating", "FieldType": "Picklist"},
+    {"ObjectName": "Lead", "FieldName": "City", "Label": "City", "FieldType": "Text"},
+    {"ObjectName": "Account", "FieldName": "City", "Label": "Billing City", "FieldType": "Text"},
+]
+
+
+def write_fields(path, fields):
+    with open(path, "w", encoding="utf-8") as file:
+        json.dump(fields, file)
+
+
+@pytest.fixture
+def fields_path(tmp_path):
+    """Point the process-wide catalog at a fixture file, then back at fields.json"""
+    path = str(tmp_path / "fields.json")
+    write_fields(path, FIELDS)
+    FieldCatalog.set_path(path)
+    yield path
+    FieldCatalog.set_path(default_fields_path())
+
+
+def test_lookups_use_object_name_and_label_case_insensitively(fields_path):
+    assert get_field_by_field_name_and_object("City", "account").name == "Billing City"
+    assert get_field_by_object_name_and_label("LEAD", "lead rating").FieldName == "Rating"
+    assert [field.FieldName for field in get_field_by_object_name("lead")] == ["Rating", "City"]
+    assert get_field_by_field_name_and_object("city", "Lead") is None
+    assert get_field_by_object_name("Case") is None
+
+
+def test_catalog_reloads_when_the_file_changes(fields_path):
+    assert get_field_by_field_name_and_object("Stage", "Opportunity") is None
+    loads = FieldCatalog.stats()["loads"]
+    assert get_field_by_object_name("Lead") is not None
+    assert FieldCatalog.stats()["loads"] == loads
+
+    write_fields(fields_path, FIELDS + [{"ObjectName": "Opportunity", "FieldName": "Stage", "Label": "Stage", "FieldType": "Picklist"}])
+    assert get_field_by_field_name_and_object("Stage", "Opportunity").field_type == "Picklist"
+    assert FieldCatalog.stats()["loads"] == loads + 1
@@ -0,0 +1,44 @@
+"""
+Tests for the local greeting / CRM pre-classifier
+"""
+import sys
+import os
+
+# The agent modules import each other relative to the app directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.builder.greeting_classifier import GreetingClassifier
+
+
+def test_plain_greetings_are_answered_locally():
+    for query in ["hi", "Hello there!", "good morning team", "hey, how are you doing today?", "namaste ji"]:
+        result = GreetingClassifier.classify(query)
+        assert result is not None, query
+        assert result["greeting"] == "YES", query
+
+
+def test_thanks_and_farewells_get_their_own_reply():
+    for query in ["thanks", "thank you so much", "hi, thanks a lot"]:
+        assert GreetingClassifier.classify(query)["greetingReply"] == GreetingClassifier.THANKS_REPLY, query
+    for query in ["bye", "goodbye team", "thanks, bye"]:
+        assert GreetingClassifier.classify(query)["greetingReply"] == GreetingClassifier.FAREWELL_REPLY, query
+    assert GreetingClassifier.classify("hello there")["greetingReply"] == GreetingClassifier.GREETING_REPLY
+
+
+def test_crm_queries_are_answered_locally():
+    for query in ["show my open leads", "hi, list all accounts", "mere cases dikhao", "top 10 deals by amount", "get invoices"]:
+        result = GreetingClassifier.classify(query)
+        assert result is not None, query
+        assert result["greeting"] == "NO", query
+
+
+def test_uncertain_queries_fall_back_to_llm():
+    before = GreetingClassifier.stats()["llm_fallback"]
+    assert GreetingClassifier.classify("hello can you help me with something") is None
+    assert GreetingClassifier.classify("what can you do") is None
+    assert GreetingClassifier.stats()["llm_fallback"] == before + 2
+
+
+def test_find_objects_uses_synonyms():
+    tokens = GreetingClassifier.tokenize("show my tickets and their related companies")
+    assert GreetingClassifier.find_objects(tokens) == ["Case", "Account"]
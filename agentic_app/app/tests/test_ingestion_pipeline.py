@@ -0,0 +1,76 @@
+"""
+Tests for the batched, concurrent vector store ingestion pipeline
+"""
+import os
+import re
+import sys
+from types import SimpleNamespace
+
+# The agent modules import each other relative to the app directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.documents import Document
+
+from agents.rag_builder import ingestion_pipeline
+from agents.rag_builder.ingestion_pipeline import IngestionPipeline
+from agents.rag_builder.vector_store import VectorStore
+
+
+class FakeEmbeddings:
+    def embed_documents(self, texts):
+        return [[float(len(text)), 1.0] for text in texts]
+
+
+class FakeCollection:
+    def __init__(self):
+        self.ids = []
+
+    def upsert(self, ids, embeddings, documents, metadatas):
+        self.ids.extend(ids)
+
+
+def count_pools(monkeypatch):
+    pools = []
+    executor = ingestion_pipeline.ThreadPoolExecutor
+
+    def counting_executor(*args, **kwargs):
+        pools.append(1)
+        return executor(*args, **kwargs)
+
+    monkeypatch.setattr(ingestion_pipeline, "ThreadPoolExecutor", counting_executor)
+    return pools
+
+
+def progress_lines(output):
+    return re.findall(r"Ingested (\d+)(?:/(\d+))? documents", output)
+
+
+def test_streamed_documents_share_one_pool_and_report_unknown_total(monkeypatch, capsys):
+    pools = count_pools(monkeypatch)
+    collection = FakeCollection()
+    documents = (SimpleNamespace(id=str(i), page_content=f"doc {i}", metadata={}) for i in range(20))
+
+    stats = IngestionPipeline(FakeEmbeddings(), batch_size=2, concurrency=2).run(SimpleNamespace(_collection=collection), documents)
+
+    assert stats["ingested"] == 20 and stats["batches"] == 10
+    assert sorted(collection.ids, key=int) == [str(i) for i in range(20)]
+    assert len(pools) == 1
+    output = capsys.readouterr().out
+    assert "total unknown" in output
+    assert [int(ingested) for ingested, _ in progress_lines(output)] == list(range(2, 21, 2))
+
+
+def test_sync_progress_is_cumulative_across_chunks(tmp_path, monkeypatch, capsys):
+    monkeypatch.setattr(ingestion_pipeline, "RAG_INGEST_BATCH_SIZE", 4)
+    monkeypatch.setattr(ingestion_pipeline, "RAG_INGEST_CONCURRENCY", 2)
+    pools = count_pools(monkeypatch)
+    documents = [Document(page_content=f"show my leads number {i}", metadata={"object_name": "Lead"}) for i in range(30)]
+
+    summary = VectorStore("local").sync_documents(documents, persist_directory=str(tmp_path))
+
+    assert summary["added"] == 30
+    assert len(pools) == 1
+    lines = progress_lines(capsys.readouterr().out)
+    assert {total for _, total in lines} == {"30"}
+    ingested = [int(count) for count, _ in lines]
+    assert ingested == sorted(ingested) and ingested[-1] == 30 and len(ingested) == 8
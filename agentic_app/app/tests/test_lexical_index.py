@@ -0,0 +1,48 @@
+"""
+Tests for the BM25 lexical index used by hybrid retrieval
+"""
+import sys
+import os
+import json
+import tempfile
+
+# The agent modules import each other relative to the app directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.rag_builder.lexical_index import LexicalIndex
+
+
+def build_index():
+    index = LexicalIndex()
+    index.add("case-city", "Show my  Case Customer City ", {
+        "object_name": "Case", "role_id": 1, "data_fields_name": "Customer City", "data_fields_FieldName": "Cas_ex1_36",
+    })
+    index.add("lead-hotlist", "Show my  Lead Hotlist ", {
+        "object_name": "Lead", "role_id": 1,
+        "data_fields": json.dumps([{"name": "Lead Name", "FieldName": "SN_Lead_Name"}, {"name": "Rating", "FieldName": "SN_RATING"}]),
+    })
+    index.add("lead-empty", "Show my  Lead Summary ", {"object_name": "Lead", "role_id": 1, "data_fields": ""})
+    return index
+
+
+def test_exact_label_and_api_name_matches():
+    index = build_index()
+    assert index.exact_match("Cas_ex1_36") == ["case-city"]
+    assert index.exact_match("show my case customer city") == ["case-city"]
+    assert index.exact_match("show my leads") == []
+
+
+def test_search_respects_where_clause():
+    index = build_index()
+    where = {"$and": [{"data_fields": {"$ne": ""}}, {"object_name": {"$in": ["Lead", "Unknown"]}}]}
+    assert index.search("lead summary hotlist", where=where) == ["lead-hotlist"]
+    assert index.search("lead summary")[0] == "lead-empty"
+
+
+def test_save_and_load_round_trip():
+    index = build_index()
+    with tempfile.TemporaryDirectory() as directory:
+        index.save(directory)
+        loaded = LexicalIndex.load(directory)
+    assert len(loaded) == 3
+    assert loaded.exact_match("sn_rating") == ["lead-hotlist"]
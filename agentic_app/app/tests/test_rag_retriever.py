@@ -0,0 +1,56 @@
+"""
+Tests for RagRetriever where-clause building and the inferred object filter fallback
+"""
+import os
+import sys
+
+import pytest
+
+# The agent modules import each other relative to the app directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from langchain_core.documents import Document
+
+from agents.rag_builder import rag_retriver
+from agents.rag_builder.rag_retriver import RagRetriever
+from agents.rag_builder.vector_store import VectorStore
+
+
+DOCUMENTS = [
+    Document(page_content="Show my  Case Customer City ", metadata={
+        "object_name": "Case", "role_id": 1, "data_fields_name": "Customer City", "data_fields_FieldName": "Cas_ex1_36",
+    }),
+    Document(page_content="Show my  Lead Hotlist ", metadata={
+        "object_name": "Lead", "role_id": 1, "data_fields_name": "Rating", "data_fields_FieldName": "SN_RATING",
+    }),
+]
+
+
+@pytest.fixture
+def retriever(tmp_path):
+    persist_directory = str(tmp_path / "vector_db")
+    VectorStore("local").sync_documents(list(DOCUMENTS), persist_directory=persist_directory)
+    return RagRetriever("local", persist_directory)
+
+
+def contexts_for(rag_contexts, query):
+    return [doc.page_content.strip() for entry in rag_contexts if entry["query"] == query for doc in entry["contexts"]]
+
+
+def test_object_filter_is_only_inferred_when_enabled(retriever, monkeypatch):
+    monkeypatch.setattr(rag_retriver, "RAG_INFER_OBJECT_FILTER", False)
+    assert retriever.build_where("show customer city") == {"data_fields": {"$ne": ""}}
+
+    monkeypatch.setattr(rag_retriver, "RAG_INFER_OBJECT_FILTER", True)
+    # "customer" is a Contact synonym even though the pattern belongs to Case
+    assert {"object_name": {"$in": ["Contact", "Unknown"]}} in retriever.build_where("show customer city")["$and"]
+
+
+@pytest.mark.parametrize("hybrid", [True, False])
+def test_inferred_filter_falls_back_when_it_finds_nothing(retriever, monkeypatch, hybrid):
+    monkeypatch.setattr(rag_retriver, "RAG_INFER_OBJECT_FILTER", True)
+    if not hybrid:
+        retriever.lexical_index = None
+
+    query = "show customer city"
+    assert contexts_for(retriever.invoke_list([query]), query)[0] == "Show my  Case Customer City"
@@ -0,0 +1,41 @@
+"""
+Tests for the rule-based query decomposer and the LLM output parser
+"""
+import sys
+import os
+
+# The agent modules import each other relative to the app directory
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from agents.builder.rule_decomposer import RuleDecomposer
+from agents.builder.query_decompositaion import QueryDecomposition
+
+
+def test_single_object_queries_are_returned_unchanged():
+    for query in ["show my top 10 leads", "show my accounts group by rating", "show leads with rating hot and status open"]:
+        assert RuleDecomposer.decompose(query) == [query], query
+
+
+def test_conjunctions_are_split_per_object():
+    assert RuleDecomposer.decompose("show my leads and cases") == ["show my leads", "show my cases"]
+    assert RuleDecomposer.decompose("show my 10 top leads, 5 accounts") == ["show my 10 top leads", "show my 5 accounts"]
+    assert RuleDecomposer.decompose("list open deals as well as get closed tickets") == ["list open deals", "get closed tickets"]
+
+
+def test_relational_and_unknown_queries_fall_back_to_llm():
+    before = RuleDecomposer.stats()["llm_fallback"]
+    for query in [
+        "show my open leads and their related activities",
+        "show my account which is related to leadid = 124545",
+        "show leads created by users",
+        "show leads and cases sorted by date and owner",
+        "what can you do",
+    ]:
+        assert RuleDecomposer.decompose(query) is None, query
+    assert RuleDecomposer.stats()["llm_fallback"] == before + 5
+
+
+def test_parse_response_never_executes_model_output():
+    assert QueryDecomposition.parse_response('["show my leads", "show my cases"]') == ["show my leads", "show my cases"]
+    assert QueryDecomposition.parse_response('```python\n["show my leads"]\n```') == ["show my leads"]
+    assert QueryDecomposition.parse_response("__import__('os').getcwd()") == ["__import__('os').getcwd()"]
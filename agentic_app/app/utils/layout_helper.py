@@ -210,8 +210,21 @@ class LayoutHelper:
 
         return xml_data
 
+    @staticmethod
+    def build_layout_field_index(all_fields: List[Dict[str, Any]]) -> Dict[str, Dict[str, Any]]:
+        """LayoutFieldId -> field; the first occurrence wins like the linear lookup"""
+        index = {}
+        for field in all_fields or []:
+            if isinstance(field, dict):
+                index.setdefault(field.get("LayoutFieldId"), field)
+        return index
+
     def get_field_by_layout_field_id(self, all_fields: Dict[str, Any], layout_field_id: str) -> Optional[Dict[str, Any]]:
         try:
+            # Index built by build_layout_field_index
+            if isinstance(all_fields, dict):
+                return all_fields.get(layout_field_id)
+
             # Handle if all_fields is a list
             if isinstance(all_fields, list):
                 for field in all_fields:
@@ -263,10 +276,10 @@ class LayoutHelper:
     def get_sections_with_fields(self, layout_xml: str) -> Optional[Dict[str, Any]]:
         pass
 
-    def build_layout(self, layout_xml: str, layout_fields) -> Optional[Dict[str, Any]]:
+    def build_layout(self, layout_xml: str, layout_fields, field_index: Optional[Dict[str, Dict[str, Any]]] = None) -> Optional[Dict[str, Any]]:
     
         root = self.reader.read_xml_string(layout_xml["LayoutXML"])
-        all_field = self.loader.loadJsonFile("fields.json")
+        all_field = field_index if field_index is not None else self.build_layout_field_index(self.loader.loadJsonFile("fields.json"))
         obj_name = self.get_object_enum_by_object_id(layout_xml["ItemTypeID"])
         tabs = self.get_tabs_with_fields(root, obj_name, all_field, layout_fields)
    
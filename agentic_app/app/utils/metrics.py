@@ -0,0 +1,153 @@
+import functools
+import inspect
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, List, Optional, Tuple
+
+# Seconds; spans cache hits (ms) up to slow multi-call LLM stages
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0, 60.0)
+
+# (name, type, help, [(labels, value), ...]) as returned by collectors
+Sample = Tuple[Dict[str, Any], float]
+Family = Tuple[str, str, str, List[Sample]]
+
+
+class Metrics:
+    """
+    Minimal in-process metrics registry rendered in the Prometheus text format.
+
+    Histograms and counters are updated where the work happens; collectors are
+    callables evaluated at scrape time that turn existing stats() dictionaries
+    into metric families, so components keep a single source of truth.
+    """
+
+    _lock = threading.Lock()
+    _help: Dict[str, Tuple[str, str]] = {}
+    _histograms: Dict[Tuple[str, Tuple], Dict[str, Any]] = {}
+    _counters: Dict[Tuple[str, Tuple], float] = {}
+    _collectors: List[Callable[[], Iterable[Family]]] = []
+
+    @staticmethod
+    def _label_key(labels: Dict[str, Any]) -> Tuple:
+        return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+    @classmethod
+    def describe(cls, name: str, metric_type: str, help_text: str) -> None:
+        with cls._lock:
+            cls._help.setdefault(name, (metric_type, help_text))
+
+    @classmethod
+    def observe(cls, name: str, value: float, buckets: Tuple[float, ...] = DEFAULT_BUCKETS, **labels: Any) -> None:
+        key = (name, cls._label_key(labels))
+        with cls._lock:
+            histogram = cls._histograms.get(key)
+            if histogram is None:
+                histogram = cls._histograms[key] = {"buckets": buckets, "counts": [0] * len(buckets), "sum": 0.0, "count": 0}
+            for index, bound in enumerate(histogram["buckets"]):
+                if value <= bound:
+                    histogram["counts"][index] += 1
+            histogram["sum"] += value
+            histogram["count"] += 1
+
+    @classmethod
+    def inc(cls, name: str, amount: float = 1.0, **labels: Any) -> None:
+        key = (name, cls._label_key(labels))
+        with cls._lock:
+            cls._counters[key] = cls._counters.get(key, 0.0) + amount
+
+    @classmethod
+    @contextmanager
+    def timer(cls, name: str, **labels: Any):
+        """Observe the wall time of the with-block in seconds"""
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            cls.observe(name, time.perf_counter() - started, **labels)
+
+    @classmethod
+    def timed(cls, name: str, **labels: Any) -> Callable:
+        """Decorator for sync or async callables; keeps the wrapped signature for LangGraph"""
+        def decorator(func: Callable) -> Callable:
+            if inspect.iscoroutinefunction(func):
+                @functools.wraps(func)
+                async def async_wrapper(*args, **kwargs):
+                    with cls.timer(name, **labels):
+                        return await func(*args, **kwargs)
+                return async_wrapper
+
+            @functools.wraps(func)
+            def wrapper(*args, **kwargs):
+                with cls.timer(name, **labels):
+                    return func(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    @classmethod
+    def register_collector(cls, collector: Callable[[], Iterable[Family]]) -> None:
+        with cls._lock:
+            if collector not in cls._collectors:
+                cls._collectors.append(collector)
+
+    @staticmethod
+    def _format_labels(label_key: Tuple, extra: Optional[Tuple[str, str]] = None) -> str:
+        pairs = list(label_key) + ([extra] if extra else [])
+        if not pairs:
+            return ""
+        escaped = (
+            f'{key}="' + str(value).replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"') + '"'
+            for key, value in pairs
+        )
+        return "{" + ",".join(escaped) + "}"
+
+    @staticmethod
+    def _format_value(value: float) -> str:
+        return repr(float(value)) if value != int(value) else str(int(value))
+
+    @classmethod
+    def render(cls) -> str:
+        """Render every metric in Prometheus exposition format (text/plain; version=0.0.4)"""
+        with cls._lock:
+            help_texts = dict(cls._help)
+            histograms = {key: dict(value, counts=list(value["counts"])) for key, value in cls._histograms.items()}
+            counters = dict(cls._counters)
+            collectors = list(cls._collectors)
+
+        lines: List[str] = []
+
+        def header(name: str, metric_type: str, help_text: str) -> None:
+            lines.append(f"# HELP {name} {help_text}")
+            lines.append(f"# TYPE {name} {metric_type}")
+
+        for name in sorted({key[0] for key in histograms}):
+            metric_type, help_text = help_texts.get(name, ("histogram", name))
+            header(name, "histogram", help_text)
+            for (metric_name, label_key), histogram in sorted(histograms.items()):
+                if metric_name != name:
+                    continue
+                for bound, count in zip(histogram["buckets"], histogram["counts"]):
+                    lines.append(f"{name}_bucket{cls._format_labels(label_key, ('le', str(bound)))} {count}")
+                lines.append(f"{name}_bucket{cls._format_labels(label_key, ('le', '+Inf'))} {histogram['count']}")
+                lines.append(f"{name}_sum{cls._format_labels(label_key)} {histogram['sum']:.6f}")
+                lines.append(f"{name}_count{cls._format_labels(label_key)} {histogram['count']}")
+
+        for name in sorted({key[0] for key in counters}):
+            metric_type, help_text = help_texts.get(name, ("counter", name))
+            header(name, "counter", help_text)
+            for (metric_name, label_key), value in sorted(counters.items()):
+                if metric_name == name:
+                    lines.append(f"{name}{cls._format_labels(label_key)} {cls._format_value(value)}")
+
+        for collector in collectors:
+            try:
+                families = list(collector())
+            except Exception as e:
+                print(f"Metrics collector {getattr(collector, '__name__', collector)} failed: {e}")
+                continue
+            for name, metric_type, help_text, samples in families:
+                header(name, metric_type, help_text)
+                for labels, value in samples:
+                    lines.append(f"{name}{cls._format_labels(cls._label_key(labels))} {cls._format_value(value)}")
+
+        return "\n".join(lines) + "\n"